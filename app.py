@@ -1,7 +1,6 @@
 import streamlit as st
-from streamlit_mic_recorder import mic_recorder
 from langchain_community.chat_message_histories import StreamlitChatMessageHistory
-from chatbot import ChatBot
+from langchain_core.messages import AIMessage, HumanMessage
 from modules.audio_utils import *
 import os
 import pandas as pd
@@ -9,12 +8,13 @@ from dotenv import load_dotenv
 import datetime
 import time
 import re
-from modules.money_transfer import MoneyTransfer, get_user_select_options, get_account_select_options, validate_transfer_input
-# Import the new account dashboard module
-from modules.account_dashboard import display_account_dashboard
-from cryptography.fernet import Fernet
 import logging
 import base64
+import hmac
+import hashlib
+import math
+import threading
+from collections import defaultdict, deque
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +23,101 @@ logging.basicConfig(
 )
 LOGGER = logging.getLogger('BankingApp')
 
+# Only the most recent messages are rendered in the chat panel
+CHAT_DISPLAY_LIMIT = 40
+
+# Older messages are evicted from the chat history and its backup past this length
+MAX_HISTORY = 50
+
+# Failed logins allowed per user ID within LOGIN_LOCKOUT_SECONDS before further attempts are refused
+MAX_FAILED_LOGINS = 5
+LOGIN_LOCKOUT_SECONDS = 15 * 60
+
+# A repeated message within this many seconds is treated as a duplicate submission
+DUPLICATE_MESSAGE_WINDOW = 30.0
+
+# Turns account type codes such as SAVINGS_ACCOUNT into words
+ACCOUNT_TYPE_SPACES = str.maketrans('_', ' ')
+
+# Chart data keys needed for the detailed chart summary given to the chatbot
+REQUIRED_CHART_KEYS = frozenset({
+    'checking_balance', 'savings_balance', 'credit_balance',
+    'avg_income', 'avg_expenses', 'savings_rate',
+    'highest_expense_month', 'highest_expense_amount',
+    'lowest_expense_month', 'lowest_expense_amount',
+    'current_balance', 'balance_90day_high', 'balance_90day_high_date',
+    'balance_90day_low', 'balance_90day_low_date',
+    'balance_monthly_trend_pct', 'spending_distribution', 'mortgage'
+})
+
+# Account terms the account balance fallback always matches, in addition to the user's own accounts
+GENERIC_ACCOUNT_TERMS = ('savings', 'checking', 'account')
+
+# Fallback patterns for account balance questions; {accounts} is an alternation of the user's account types and names
+ACCOUNT_BALANCE_TEMPLATES = (
+    r"how much (do|have) i (have )?in my ({accounts})",
+    r"what('s| is) my ({accounts}) (account )?balance",
+    r"balance in (my )?({accounts})",
+    r"how much money (do|have) i (have )?in (my )?({accounts})",
+)
+
+# Fallback pattern for spending analysis questions, one alternation so a message is scanned once
+SPENDING_PATTERN = re.compile("|".join(f"(?:{pattern})" for pattern in (
+    r"(which|what) category should i cut back",
+    r"spending analytics",
+    r"where (am i|are my) (over)?spending",
+    r"category.*spend",
+    r"spend.*category",
+)))
+
+# Users offered on the login form, with their display names
+LOGIN_USER_NAMES = {
+    "USR001": ("Darren", "Smith"),
+    "USR002": ("Maria", "Smith"),
+    "USR003": ("Enric", "Smith"),
+    "USR004": ("Randy", "Smith"),
+    "USR005": ("Victor", "Smith")
+}
+LOGIN_USER_IDS = tuple(LOGIN_USER_NAMES)
+LOGIN_USER_INDEX = {user_id: i for i, user_id in enumerate(LOGIN_USER_IDS)}
+
+# Columns of users.csv needed to authenticate and greet a user
+LOGIN_USER_COLUMNS = ['user_id', 'first_name', 'last_name', 'password']
+
+# Session state defaults; callables are factories so every session gets fresh objects and timestamps
+INITIAL_SESSION_STATE = {
+    "session_start_time": time.time,  # Extend session state expiration (by default it's 60 minutes)
+    "message_ids": set,
+    "last_run_timestamp": time.time,
+    "processing_message": False,
+    "chat_history_backup": list,
+    "send_input": False,
+    "user_question": "",
+    "last_processed_message": "",
+    "audio_file": None,
+    "last_intent": None,
+    "last_rerun": 0,
+    "debug_audio": "",
+    "debug_transcription": "",
+    "processed_messages": dict  # Message hash -> time last processed, to prevent loops
+}
+
+# Landing page text shown before login
+WELCOME_MARKDOWN = """
+        ### Welcome to AletaBanc Copilot
+        
+        Your personal AI-powered financial assistant, designed to help you manage your finances efficiently.
+        
+        Access your accounts securely through the login panel on the left. AletaBanc Copilot helps you:
+        
+        - Monitor account balances and transactions
+        - Analyze spending patterns and set budgets
+        - Get personalized financial insights
+        - Transfer funds between accounts
+        - Receive answers to your banking questions
+        
+        """
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -34,12 +129,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Function to load and inject custom CSS
-def load_css():
+@st.cache_data
+def get_css_markup():
+    """Read the stylesheets and background image once and return them as one markup string."""
+    markup = []
+    
     # Load the main CSS file
     try:
         with open("static/css/login.css", "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+            markup.append(f"<style>{f.read()}</style>")
     except Exception as e:
         LOGGER.warning(f"Could not load login.css: {str(e)}")
     
@@ -67,7 +165,7 @@ def load_css():
         }}
         </style>
         """
-        st.markdown(background_style, unsafe_allow_html=True)
+        markup.append(background_style)
     except Exception as e:
         LOGGER.warning(f"Error loading background: {str(e)}")
     
@@ -75,32 +173,17 @@ def load_css():
     try:
         with open("static/css/theme.css", "r") as f:
             theme_css = f.read()
-            st.markdown(f"<style>{theme_css}</style>", unsafe_allow_html=True)
+            markup.append(f"<style>{theme_css}</style>")
     except Exception as e:
         LOGGER.warning(f"Could not load theme.css: {str(e)}")
-        
-    # Additional JavaScript for custom styling
-    st.markdown("""
-    <script>
-    document.addEventListener('DOMContentLoaded', function() {
-        // Add classes to financial elements
-        document.querySelectorAll('td:nth-child(7)').forEach(cell => {
-            if(cell.textContent.trim().toLowerCase() === 'active') {
-                cell.classList.add('status-active');
-            }
-        });
-        
-        // Add money formatting classes
-        document.querySelectorAll('td:nth-child(4), td:nth-child(5)').forEach(cell => {
-            cell.classList.add('money-value');
-        });
-        
-        // Ensure theme is applied
-        const isDarkMode = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
-        document.body.classList.add(isDarkMode ? 'force-dark' : 'force-light');
-    });
-    </script>
-    """, unsafe_allow_html=True)
+
+    
+    return "\n".join(markup)
+
+# Function to load and inject custom CSS
+def load_css():
+    # A single element carries the background and theme style blocks
+    st.markdown(get_css_markup(), unsafe_allow_html=True)
 
 # Function to get base64 encoding of an image
 def get_image_base64(image_path):
@@ -113,19 +196,23 @@ def display_image_html(image_path, width="200px", class_name=""):
     img_html = f'<img src="data:image/png;base64,{img_base64}" width="{width}" class="{class_name}">'
     return img_html
 
-# Extend session state expiration (by default it's 60 minutes)
-if "session_start_time" not in st.session_state:
-    st.session_state.session_start_time = time.time()
-
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def load_users_data():
-    """Load and cache user data from CSV."""
-    return pd.read_csv('data/users.csv')
+    """Load and cache the login fields of each user from CSV, keyed by user ID."""
+    users_df = pd.read_csv(
+        'data/users.csv',
+        engine='pyarrow',
+        usecols=LOGIN_USER_COLUMNS,
+        dtype={column: str for column in LOGIN_USER_COLUMNS}
+    )
+    return users_df.set_index('user_id', drop=False).to_dict('index')
 
 @st.cache_resource
 def get_chatbot_instance(user_id=None, user_fullname=None):
     """Create and cache a ChatBot instance for improved performance."""
     try:
+        # Imported here so the langchain/sklearn stack only loads once a chat message is sent
+        from chatbot import ChatBot
         chatbot = ChatBot()
         if user_fullname:
             chatbot.user_fullname = user_fullname
@@ -136,6 +223,181 @@ def get_chatbot_instance(user_id=None, user_fullname=None):
         st.error(f"Error initializing ChatBot: {str(e)}")
         return None
 
+def get_session_chatbot():
+    """Return the ChatBot bound to this session, creating it on first use."""
+    chatbot = st.session_state.get("chatbot")
+    if chatbot is None:
+        chatbot = get_chatbot_instance(user_id=st.session_state.current_user_id, user_fullname=st.session_state.user_fullname)
+        if chatbot is not None:
+            st.session_state.chatbot = chatbot
+    return chatbot
+
+def trim_chat_history(chat_history, backup_key):
+    """Keep only the last MAX_HISTORY messages in the chat history and its backup."""
+    messages = chat_history.messages
+    if len(messages) > MAX_HISTORY:
+        messages[:] = messages[-MAX_HISTORY:]
+    if len(st.session_state[backup_key]) > MAX_HISTORY:
+        st.session_state[backup_key] = st.session_state[backup_key][-MAX_HISTORY:]
+
+def stream_chat_reply(chat_container, chatbot, user_message, speech, chart_context=None):
+    """Show the user's message and stream the chatbot's reply into the chat, returning the reply text.
+    
+    Completed sentences are handed to speech so synthesis overlaps with generation.
+    """
+    with chat_container:
+        st.chat_message("human").write(user_message)
+        chunks = speech.feed(chatbot.stream_response(user_message, chart_context=chart_context))
+        response = st.chat_message("ai").write_stream(chunks)
+    # write_stream returns a list instead of a string when nothing was streamed
+    return response if isinstance(response, str) else "".join(map(str, response))
+
+def message_digest(message, user_id):
+    """Return a fixed-size hash of a user's message for duplicate detection."""
+    return hashlib.blake2b(f"{message}:{user_id}".encode("utf-8"), digest_size=16).digest()
+
+def is_duplicate_message(message_hash):
+    """Return True if the message was processed within DUPLICATE_MESSAGE_WINDOW, otherwise record it as processed now."""
+    now = time.monotonic()
+    processed = st.session_state.processed_messages
+    last_seen = processed.get(message_hash)
+    if last_seen is not None and now - last_seen < DUPLICATE_MESSAGE_WINDOW:
+        return True
+    processed[message_hash] = now
+    
+    # Forget expired entries once the table grows
+    if len(processed) > 64:
+        st.session_state.processed_messages = {
+            key: seen for key, seen in processed.items() if now - seen < DUPLICATE_MESSAGE_WINDOW
+        }
+    return False
+
+@st.cache_resource(max_entries=128)
+def get_account_balance_pattern(account_pattern):
+    """Compile the account balance fallback patterns into one regex for an alternation of account identifiers."""
+    return re.compile("|".join(f"(?:{template.format(accounts=account_pattern)})" for template in ACCOUNT_BALANCE_TEMPLATES))
+
+class UncachedIntent(Exception):
+    """Carries an intent out of cached_classify_message without it being cached."""
+
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def cached_classify_message(message, has_spending_chart, _chatbot):
+    """Classify a message's intent, cached across sessions so repeated questions skip the embedding lookup.
+    
+    has_spending_chart only keys the cache: the classifier uses a lower threshold when spending charts are shown.
+    """
+    intent = _chatbot.classify_text(message)
+    if intent == "default":
+        # Also what a chatbot without a loaded model or a failed classification returns,
+        # so it is never cached; raising keeps st.cache_data from storing it
+        raise UncachedIntent(intent)
+    return intent
+
+def classify_message(message, has_spending_chart, chatbot):
+    """Classify a message's intent, reusing cached results for anything but "default"."""
+    try:
+        return cached_classify_message(message, has_spending_chart, chatbot)
+    except UncachedIntent as e:
+        return e.args[0]
+
+def dashboard_has_spending_chart():
+    """Return True if the dashboard context in session state includes category spending data."""
+    chart_data = st.session_state.get('dashboard_context', {}).get('chart_data', {})
+    return bool(chart_data.get('category_spending'))
+
+def extract_account_identifiers(accounts):
+    """Return the lowercased account types and names of the given accounts, sorted for pattern caching."""
+    account_types = []
+    account_names = []
+    
+    try:
+        # Extract all account types and names
+        for account in accounts:
+            if 'account_type' in account:
+                account_types.append(account['account_type'].translate(ACCOUNT_TYPE_SPACES).lower())
+            if 'account_name' in account:
+                account_names.append(account['account_name'].lower())
+    except Exception as e:
+        # Log but don't break if error occurs
+        logging.error(f"Error extracting account types: {str(e)}")
+    
+    # Generic terms always match, so "my savings" still works for an account named "regular savings"
+    return tuple(sorted(set(GENERIC_ACCOUNT_TERMS).union(account_types, account_names)))
+
+def get_account_identifiers():
+    """Return the account identifiers stored by the Account Overview page, or the generic account terms."""
+    identifiers = st.session_state.get('account_identifiers')
+    return identifiers if identifiers is not None else extract_account_identifiers(())
+
+def fallback_intent(message, account_identifiers):
+    """Match a message against the fallback intent patterns, returning the intent or None."""
+    msg_lower = message.lower()
+    # Account names are user data, so they are matched literally
+    if get_account_balance_pattern('|'.join(map(re.escape, account_identifiers))).search(msg_lower):
+        return "Account Inquiries"
+    if SPENDING_PATTERN.search(msg_lower):
+        return "Spending Analysis"
+    return None
+
+def build_chart_context(chart_data):
+    """Convert the dashboard chart data to a readable summary for the chatbot."""
+    # Only build the detailed summary if all required keys exist
+    if REQUIRED_CHART_KEYS <= chart_data.keys():
+        return f"""
+        Current account balances:
+        - Checking: ${chart_data['checking_balance']:,.2f}
+        - Savings: ${chart_data['savings_balance']:,.2f}
+        - Credit Card: ${chart_data['credit_balance']:,.2f}
+        
+        Income vs Expenses:
+        - Average monthly income: ${chart_data['avg_income']:,}
+        - Average monthly expenses: ${chart_data['avg_expenses']:,}
+        - Current savings rate: {chart_data['savings_rate']}%
+        - Highest expense month: {chart_data['highest_expense_month']} (${chart_data['highest_expense_amount']:,})
+        - Lowest expense month: {chart_data['lowest_expense_month']} (${chart_data['lowest_expense_amount']:,})
+        
+        Account Balance Trend:
+        - Current balance: ${chart_data['current_balance']:,}
+        - 90-day high: ${chart_data['balance_90day_high']:,} on {chart_data['balance_90day_high_date']}
+        - 90-day low: ${chart_data['balance_90day_low']:,} on {chart_data['balance_90day_low_date']}
+        - Monthly trend: {chart_data['balance_monthly_trend_pct']}% growth
+        
+        Spending Distribution:
+        {'; '.join([f"{category}: {details['percentage']}% (${details['amount']:,})" 
+                    for category, details in chart_data['spending_distribution'].items()])}
+        
+        Mortgage:
+        - Original amount: ${chart_data['mortgage']['original_amount']:,}
+        - Current balance: ${chart_data['mortgage']['current_balance']:,}
+        - Paid off: ${chart_data['mortgage']['paid_off']:,} ({chart_data['mortgage']['paid_off_percentage']}%)
+        - Monthly payment: ${chart_data['mortgage']['monthly_payment']:,}
+        - Interest rate: {chart_data['mortgage']['interest_rate']}%
+        """
+    # Fall back to a simpler context if keys are missing
+    return "User is viewing their account dashboard with financial information."
+
+def get_chart_context():
+    """Return the chart summary for the chatbot, rebuilt only when the dashboard's chart data changes."""
+    signature = st.session_state.get('dashboard_chart_signature')
+    cached = st.session_state.get('chart_context_cache')
+    if signature is not None and cached is not None and cached[0] == signature:
+        return cached[1]
+    chart_context = build_chart_context(st.session_state.chart_data)
+    st.session_state.chart_context_cache = (signature, chart_context)
+    return chart_context
+
+def render_voice_debug(placeholder):
+    """Show the voice recording debug info, if any, in the given placeholder."""
+    debug_audio = st.session_state.get('debug_audio')
+    debug_transcription = st.session_state.get('debug_transcription')
+    if debug_audio or debug_transcription:
+        with placeholder.container():
+            with st.expander("Voice Recording Debug Info (Click to hide)"):
+                if debug_audio:
+                    st.write(debug_audio)
+                if debug_transcription:
+                    st.write(debug_transcription)
+
 def set_send_input():
     """Sets the send_input session state to True."""
     st.session_state.send_input = True
@@ -146,43 +408,65 @@ def clear_input_field():
     st.session_state.user_question = st.session_state.user_input
     st.session_state.user_input = ""
 
+@st.cache_resource
+def get_failed_logins():
+    """Return the process-wide record of recent failed login times for each user ID."""
+    return defaultdict(deque)
+
+@st.cache_resource
+def get_failed_logins_lock():
+    """Return the lock that serializes access to get_failed_logins() across session threads."""
+    return threading.Lock()
+
 def authenticate_user(user_id, password):
-    """Authenticate a user by ID and password."""
+    """Authenticate a user by ID and password.
+    
+    Returns (authenticated, user_data, locked_for), where locked_for is the number of
+    seconds the user ID stays locked after too many failures, or 0 if it is not locked.
+    """
     try:
+        # Refuse without checking once the user has too many recent failures
+        now = time.monotonic()
+        with get_failed_logins_lock():
+            failed_logins = get_failed_logins()[user_id]
+            while failed_logins and now - failed_logins[0] > LOGIN_LOCKOUT_SECONDS:
+                failed_logins.popleft()
+            if len(failed_logins) >= MAX_FAILED_LOGINS:
+                # The lock lifts once enough of the recent failures have expired
+                oldest_counted = failed_logins[len(failed_logins) - MAX_FAILED_LOGINS]
+                return False, None, max(LOGIN_LOCKOUT_SECONDS - (now - oldest_counted), 1)
+        
         # Load users data from cached function
-        users_df = load_users_data()
+        users = load_users_data()
         
         # Check if user exists
-        if user_id in users_df['user_id'].values:
-            # Get user data
-            user_row = users_df[users_df['user_id'] == user_id]
-            user_data = user_row.iloc[0]
-            
-            # Compare passwords
+        user_data = users.get(user_id)
+        if user_data is not None:
+            # Compare passwords in constant time
             stored_password = user_data['password']
             
-            if password.strip() == stored_password:
+            if hmac.compare_digest(password.strip().encode(), str(stored_password).encode()):
                 # Set the last login timestamp
-                st.session_state.last_login_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                return True, user_data
+                st.session_state.last_login_time = time.strftime("%Y-%m-%d %H:%M:%S")
+                with get_failed_logins_lock():
+                    get_failed_logins().pop(user_id, None)
+                return True, user_data, 0
             else:
                 # Track failed attempts for rate limiting
-                if "failed_attempts" not in st.session_state:
-                    st.session_state.failed_attempts = 1
-                else:
-                    st.session_state.failed_attempts += 1
-                    
-                # Limit login attempts (optional security feature)
-                if st.session_state.failed_attempts >= 5:
-                    time.sleep(2)  # Add delay after multiple failed attempts
-                    
-                return False, None
+                with get_failed_logins_lock():
+                    get_failed_logins()[user_id].append(now)
+                return False, None, 0
         else:
-            return False, None
+            return False, None, 0
     
     except Exception as e:
         logging.error(f"Authentication error: {str(e)}")
-        return False, None
+        return False, None, 0
+
+def format_login_user(user_id):
+    """Label a login option as '<user ID> - <full name>'."""
+    names = LOGIN_USER_NAMES.get(user_id)
+    return f"{user_id} - {' '.join(names)}" if names else user_id
 
 def display_auth_sidebar():
     """Display authentication sidebar and handle authentication logic."""
@@ -202,32 +486,13 @@ def display_auth_sidebar():
                 st.markdown(f"<p style='font-size: 0.8rem; color: #666;'>Last login: {st.session_state.last_login_time}</p>", unsafe_allow_html=True)
             
             if st.button("Logout"):
-                # Capture current user ID before clearing state
-                current_user = None
-                if 'current_user_id' in st.session_state:
-                    current_user = st.session_state.current_user_id
-                
                 # Clear authentication state
                 for key in ['authenticated', 'current_user_id', 'user_fullname', 'last_login_time']:
                     if key in st.session_state:
                         del st.session_state[key]
                 
-                # Clear user-specific history if we have a user ID
-                if current_user:
-                    user_history_key = f'history_{current_user}'
-                    backup_key = f'chat_history_backup_{current_user}'
-                    display_key = f'displayed_messages_{current_user}'
-                    
-                    # Don't delete the history keys as they should persist between sessions
-                    # Just don't display them for the logged out state
-                    
-                    # Clear display tracking for this user
-                    if display_key in st.session_state:
-                        st.session_state[display_key] = {}
-                
-                # Clear generic display tracking
-                if 'displayed_messages' in st.session_state:
-                    st.session_state.displayed_messages = {}
+                # Don't delete the user's history keys as they should persist between sessions
+                # Just don't display them for the logged out state
                 
                 # Clear audio-related state
                 if 'audio_file' in st.session_state:
@@ -237,8 +502,9 @@ def display_auth_sidebar():
                 if 'last_processed_message' in st.session_state:
                     st.session_state.last_processed_message = ""
                 
-                # Clear the cached resources to ensure a fresh start
-                st.cache_resource.clear()
+                # Drop the session's chatbot and the cached ChatBot instances to ensure a fresh start
+                st.session_state.pop("chatbot", None)
+                get_chatbot_instance.clear()
                 
                 st.rerun()
         else:
@@ -249,28 +515,16 @@ def display_auth_sidebar():
             st.subheader("Login")
             
             # Check if there's a remembered user
-            default_index = 0
-            if "remember_user" in st.session_state:
-                remembered_user = st.session_state.remember_user
-                user_options = ["USR001", "USR002", "USR003", "USR004", "USR005"]
-                if remembered_user in user_options:
-                    default_index = user_options.index(remembered_user)
+            default_index = LOGIN_USER_INDEX.get(st.session_state.get("remember_user"), 0)
             
             # User ID selection with default if remembered
             user_id = st.selectbox("Select User ID", 
-                               ["USR001", "USR002", "USR003", "USR004", "USR005"],
+                               LOGIN_USER_IDS,
                                index=default_index,
-                               format_func=lambda x: f"{x} - {'Darren Smith' if x == 'USR001' else 'Maria Smith' if x == 'USR002' else 'Enric Smith' if x == 'USR003' else 'Randy Smith' if x == 'USR004' else 'Victor Smith' if x == 'USR005' else x}")
+                               format_func=format_login_user)
             
             # Get user first name for password hint
-            user_name_map = {
-                "USR001": "darren", 
-                "USR002": "maria", 
-                "USR003": "enric", 
-                "USR004": "randy", 
-                "USR005": "victor"
-            }
-            selected_name = user_name_map.get(user_id, "")
+            selected_name = LOGIN_USER_NAMES.get(user_id, ("", ""))[0].lower()
             id_digits = user_id[-3:] if user_id else ""
             password_hint = f"{selected_name}{id_digits}" if selected_name else "firstname001"
             
@@ -301,7 +555,7 @@ def display_auth_sidebar():
                 if not password:
                     st.markdown('<div class="login-error">Please enter your password</div>', unsafe_allow_html=True)
                 else:
-                    authenticated, user_data = authenticate_user(user_id, password)
+                    authenticated, user_data, locked_for = authenticate_user(user_id, password)
                     if authenticated:
                         # Set authentication data first (before clearing anything)
                         st.session_state.authenticated = True
@@ -321,20 +575,16 @@ def display_auth_sidebar():
                         # Clear any previous user's data
                         initialize_session_state()
                         
-                        # Initialize user-specific display tracking
-                        display_key = f'displayed_messages_{user_id}'
-                        st.session_state[display_key] = {}
-                        
                         # Clear cache to ensure fresh chatbot instance with updated code
-                        st.cache_resource.clear()
+                        st.session_state.pop("chatbot", None)
+                        get_chatbot_instance.clear()
                         
                         st.markdown(f'<div class="login-success">Welcome, {st.session_state.user_fullname}!</div>', unsafe_allow_html=True)
                         st.rerun()
                     else:
-                        # Clear any previous failed attempts message
-                        failed_count = st.session_state.get("failed_attempts", 0)
-                        if failed_count > 3:
-                            st.markdown('<div class="login-error">Too many incorrect attempts. Please try again after a short delay.</div>', unsafe_allow_html=True)
+                        if locked_for:
+                            minutes = math.ceil(locked_for / 60)
+                            st.markdown(f'<div class="login-error">Too many incorrect attempts. This account is locked, please try again in {minutes} minute{"s" if minutes != 1 else ""}.</div>', unsafe_allow_html=True)
                         else:
                             st.markdown('<div class="login-error">Authentication failed. Please check your credentials.</div>', unsafe_allow_html=True)
             
@@ -346,22 +596,20 @@ def clear_chat_history():
         # Clear user-specific history
         user_history_key = f'history_{st.session_state.current_user_id}'
         backup_key = f'chat_history_backup_{st.session_state.current_user_id}'
-        display_key = f'displayed_messages_{st.session_state.current_user_id}'
         
         if user_history_key in st.session_state:
             del st.session_state[user_history_key]
+        # The history handle wraps the deleted list, so rebuild it on the next run
+        st.session_state.pop(f'chat_history_obj_{st.session_state.current_user_id}', None)
+        st.session_state.pop(f'history_restored_{st.session_state.current_user_id}', None)
         if backup_key in st.session_state:
             st.session_state[backup_key] = []
-        if display_key in st.session_state:
-            st.session_state[display_key] = {}
     
     # Also clean up the old generic keys if they exist
     if 'history' in st.session_state:
         del st.session_state['history']
     if 'chat_history_backup' in st.session_state:
         st.session_state.chat_history_backup = []
-    if 'displayed_messages' in st.session_state:
-        st.session_state.displayed_messages = {}
         
     # Reset message processing state
     st.session_state.last_processed_message = ""
@@ -370,951 +618,840 @@ def clear_chat_history():
     
     # Clear processed messages to allow fresh interactions
     if 'processed_messages' in st.session_state:
-        st.session_state.processed_messages = set()
+        st.session_state.processed_messages = {}
         
     # Clear the cached ChatBot instance to ensure updates are applied
-    st.cache_resource.clear()
+    st.session_state.pop("chatbot", None)
+    get_chatbot_instance.clear()
     
     # Use timestamp to prevent rapid reruns
-    current_time = datetime.datetime.now().timestamp()
-    st.session_state.last_rerun = current_time
+    st.session_state.last_rerun = time.monotonic()
     st.rerun()
 
 def initialize_session_state():
     """Initialize all session state variables only once."""
-    # List of all session state vars with their default values
-    default_vars = {
-        "message_ids": set(),
-        "last_run_timestamp": time.time(),
-        "processing_message": False,
-        "chat_history_backup": [],
-        "send_input": False,
-        "user_question": "",
-        "last_processed_message": "",
-        "audio_file": None,
-        "last_intent": None,
-        "last_rerun": 0,
-        "debug_audio": "",
-        "debug_transcription": "",
-        "processed_messages": set()  # Track already processed messages to prevent loops
-    }
-    
     # Set default values for any missing session state variables
-    for var, default in default_vars.items():
-        if var not in st.session_state:
-            st.session_state[var] = default
+    missing = {
+        var: default() if callable(default) else default
+        for var, default in INITIAL_SESSION_STATE.items()
+        if var not in st.session_state
+    }
+    if missing:
+        st.session_state.update(missing)
 
-def main():
-    # Load CSS once per session
-    if "css_loaded" not in st.session_state:
-        load_css()
-        st.session_state.css_loaded = True
-    
-    # Set app title
-    st.title("AletaBanc Copilot")
+# Handle money transfer intents from voice commands
+def process_money_transfer_intent(chatbot, user_input, user_id):
+    """
+    Process a voice command for transferring money between accounts.
     
-    # Initialize session state once
-    initialize_session_state()
-    
-    # Display authentication sidebar
-    display_auth_sidebar()
+    Args:
+        chatbot: Instance of ChatBot
+        user_input: The transcribed voice command
+        user_id: The current user ID
     
-    # Check if user is authenticated
-    if "authenticated" not in st.session_state or not st.session_state.authenticated:
-        st.info("Please log in to access the banking assistant.")
-        st.markdown("""
-        ### Welcome to AletaBanc Copilot
+    Returns:
+        tuple: (bool success, str message)
+    """
+    try:
+        # Use the intent analyzer to extract parameters
+        intent_analysis = chatbot.intent_analyzer.analyze(user_input)
         
-        Your personal AI-powered financial assistant, designed to help you manage your finances efficiently.
+        # Extract parameters for the transfer
+        params = intent_analysis.get("parameters", {})
+        source_account_type = params.get("source_account_type")
+        target_account_type = params.get("target_account_type")
+        amount = params.get("amount")
+        description = params.get("description", "Voice Transfer")
         
-        Access your accounts securely through the login panel on the left. AletaBanc Copilot helps you:
+        # Validate we have the necessary parameters
+        if not source_account_type or not target_account_type:
+            return False, "I need to know which accounts to transfer between. Please specify your source and target accounts."
         
-        - Monitor account balances and transactions
-        - Analyze spending patterns and set budgets
-        - Get personalized financial insights
-        - Transfer funds between accounts
-        - Receive answers to your banking questions
+        if not amount:
+            return False, "I need to know how much money to transfer. Please specify an amount."
         
-        """)
-        return
-    
+        # Use the MoneyTransfer instance shared with the Money Transfer page
+        money_transfer = get_money_transfer()
+        
+        # Execute the transfer against the latest balances, serialized with other sessions
+        with money_transfer.lock:
+            money_transfer.reload_if_changed()
+            result = money_transfer.transfer_money(
+                source_user_id=user_id,
+                target_user_id=user_id,  # Same user for both accounts
+                amount=amount,
+                source_account_type=source_account_type,
+                target_account_type=target_account_type,
+                description=description
+            )
+        
+        # Check result and format response
+        if result["status"] == "success":
+            # Balances changed, so refresh the transfer form's account options
+            get_transfer_account_options.clear()
+            source_label = source_account_type.translate(ACCOUNT_TYPE_SPACES).lower()
+            target_label = target_account_type.translate(ACCOUNT_TYPE_SPACES).lower()
+            return True, f"I've successfully transferred ${amount:.2f} from your {source_label} " \
+                  f"to your {target_label}. " \
+                  f"Your new balance in the source account is ${result['source_balance']:.2f}."
+        else:
+            return False, f"I couldn't complete the transfer: {result['message']}. Please try again."
+        
+    except Exception as e:
+        LOGGER.error(f"Error in voice money transfer: {e}")
+        return False, "I encountered an error while trying to process the transfer. Please try again or use the transfer form instead."
+
+@st.experimental_fragment
+def render_chat_panel(chat_history, backup_key, selected_menu):
+    """Render the chat input, history and voice response as a fragment.
+
+    Typing or recording only reruns this panel instead of the whole page.
+    """
     # Container for chat history
     chat_container = st.container()
     
     # Audio container for voice responses
     audio_container = st.container()
     
-    # Initializing chat history with enhanced persistence and user-specific key
-    user_history_key = f'history_{st.session_state.current_user_id}'
-    chat_history = StreamlitChatMessageHistory(key=user_history_key)
-    
-    # If chat history is empty but we have a backup, restore it
-    backup_key = f'chat_history_backup_{st.session_state.current_user_id}'
-    if not chat_history.messages and backup_key in st.session_state:
-        for msg in st.session_state[backup_key]:
-            if msg['type'] == 'human':
-                chat_history.add_user_message(msg['content'])
-            elif msg['type'] == 'ai':
-                chat_history.add_ai_message(msg['content'])
-    
-    # Ensure we have a user-specific backup list
-    if backup_key not in st.session_state:
-        st.session_state[backup_key] = []
-    
     # Initialize ChatBot instance lazily - only when actually needed
     # This prevents slow ML model loading from blocking page load
     chatbot = None  # Will be initialized when first message is processed
     
-    # After user is authenticated, add sidebar menu
-    if "authenticated" in st.session_state and st.session_state.authenticated:
-        st.sidebar.subheader("Navigation")
-        
-        # Menu options - Removed Transaction History and Spending Analytics as they're now part of Account Overview
-        menu_options = [
-            "Account Overview",  
-            "Money Transfer",
-            "Financial Advice"
-        ]
-        
-        selected_menu = st.sidebar.radio("Select a feature", menu_options)
-        
-        # Store the menu selection in session state to preserve it during reruns
-        st.session_state.selected_menu = selected_menu
-        
-        # Add a button to clear chat history
-        if st.sidebar.button("Clear Chat History"):
-            clear_chat_history()
-
-        # Only show chat input, recording, and chat history in Account Overview
-        voice_recording = None
-        if selected_menu != "Money Transfer" and selected_menu != "Financial Advice":
-            # Text input field for user questions/messages with automatic submission
-            user_input = st.text_input("Type your message", key="user_input", on_change=set_send_input)
+    # Text input field for user questions/messages with automatic submission
+    user_input = st.text_input("Type your message", key="user_input", on_change=set_send_input)
+    
+    # Create column for voice recording
+    col1 = st.columns([1])[0]
+    
+    # Voice recording in column
+    with col1:
+        from streamlit_mic_recorder import mic_recorder
+        voice_recording = mic_recorder(start_prompt="Start Recording", stop_prompt="Stop Recording", key="voice_recording")
+
+    # Display chat history
+    if chat_history.messages:
+        with chat_container:
+            st.subheader("Chat History:")
             
-            # Create column for voice recording
-            col1 = st.columns([1])[0]
+            # Messages past the display limit are only rendered on request
+            older = chat_history.messages[:-CHAT_DISPLAY_LIMIT]
+            if older and st.toggle(f"Show {len(older)} older messages", key="show_older_messages"):
+                for message in older:
+                    st.chat_message(message.type).markdown(message.content)
             
-            # Voice recording in column
-            with col1:
-                voice_recording = mic_recorder(start_prompt="Start Recording", stop_prompt="Stop Recording", key="voice_recording")
-        
-            # Display chat history with deduplication tracking
-            if chat_history.messages:
-                with chat_container:
-                    st.subheader("Chat History:")
-                    
-                    # Use user-specific display tracking key
-                    display_key = f"displayed_messages_{st.session_state.current_user_id}"
-                    
-                    # Initialize display tracking if not exists
-                    if display_key not in st.session_state:
-                        st.session_state[display_key] = {}
-                    
-                    # Reset displayed messages for fresh display
-                    st.session_state[display_key] = {}
-                    
-                    # Display all messages in the chat history
-                    for i, message in enumerate(chat_history.messages):
-                        st.chat_message(message.type).write(message.content)
-                        
-                        # Create a unique key for this message for tracking
-                        message_key = f"{message.type}_{i}_{message.content[:50]}"
-                        st.session_state[display_key][message_key] = True
-        
-            # Display audio player if an audio file is available
-            with audio_container:
-                if st.session_state.audio_file:
-                    st.write("🔊 Voice Response:")
-                    col_intent, col_player = st.columns([1, 3])
-                    with col_intent:
-                        if st.session_state.last_intent:
-                            st.info(f"Intent: {st.session_state.last_intent}")
-                    with col_player:
-                        st.audio(st.session_state.audio_file)
+            for message in chat_history.messages[-CHAT_DISPLAY_LIMIT:]:
+                st.chat_message(message.type).markdown(message.content)
+
+    # Display audio player if an audio file is available
+    with audio_container:
+        if st.session_state.audio_file:
+            st.write("🔊 Voice Response:")
+            col_intent, col_player = st.columns([1, 3])
+            with col_intent:
+                if st.session_state.last_intent:
+                    st.info(f"Intent: {st.session_state.last_intent}")
+            with col_player:
+                st.audio(st.session_state.audio_file)
+    
+    # Update the voice recording handling code to process money transfer intents
+    # Handling voice recording input
+    # Voice debug info is filled in after the handler, or directly by its early exits
+    debug_placeholder = st.empty()
+    if voice_recording:
+        # Resolve the session state proxy and this user's backup list once for the handler
+        ss = st.session_state
+        backup = ss[backup_key]
+        try:
+            # Initialize chatbot lazily on first use
+            if chatbot is None:
+                chatbot = get_session_chatbot()
             
-            # Add this function to handle money transfer intents from voice commands
-            def process_money_transfer_intent(chatbot, user_input, user_id):
-                """
-                Process a voice command for transferring money between accounts.
+            # Prevent multiple runs of the same message
+            current_time = time.time()
+            if current_time - ss.last_run_timestamp < 0.5:
+                return
                 
-                Args:
-                    chatbot: Instance of ChatBot
-                    user_input: The transcribed voice command
-                    user_id: The current user ID
+            ss.last_run_timestamp = current_time
+            
+            # Log the voice recording received
+            ss.debug_audio = "Voice recording received"
+            
+            # Directly use voice_recording with our improved transcribe_audio function
+            transcribed_text = transcribe_audio(voice_recording)
+            
+            # Add debug info
+            if transcribed_text:
+                ss.debug_transcription = f"Transcribed text: {transcribed_text}"
+            else:
+                ss.debug_transcription = "Transcription failed or returned empty"
+                ss.send_input = False  # Reset to prevent continuous reruns
+                # Explicitly clear voice_recording widget from session state on failure
+                if 'voice_recording' in ss:
+                    del ss['voice_recording']
+                render_voice_debug(debug_placeholder)
+                return
                 
-                Returns:
-                    tuple: (bool success, str message)
-                """
+            # Create a hash of the message to track if it's been processed
+            message_hash = message_digest(transcribed_text, ss.current_user_id)
+            
+            # Skip if this exact message has already been processed recently; otherwise record it
+            if is_duplicate_message(message_hash):
+                ss.debug_transcription += " (Skipped - duplicate message)"
+                ss.send_input = False  # Reset to prevent continuous reruns
+                # Explicitly clear voice_recording widget from session state to prevent reprocessing
+                if 'voice_recording' in ss:
+                    del ss['voice_recording']
+                render_voice_debug(debug_placeholder)
+                return
+            
+            ss.processing_message = True
+            
+            # Collects speech for the reply while it streams
+            speech = StreamingSpeech()
+            
+            # Add user message to chat history
+            chat_history.add_user_message(transcribed_text)
+            
+            # Update chat history backup
+            backup.append({"type": "human", "content": transcribed_text})
+            
+            # Get intent classification with fallback to _classify_intent if classify_text fails
+            try:
+                # Use standard classification first (embedding-based similarity)
+                intent = classify_message(transcribed_text, dashboard_has_spending_chart(), chatbot)
+                ss.debug_intent = f"Classified intent: {intent}"
+                
+                # Format intent for display (replace underscores with spaces)
+                if "_" in intent:
+                    intent = intent.replace("_", " ")
+                
+                # Only use pattern matching as fallback if embedding classification returned "default"
+                if intent == "default":
+                    fallback = fallback_intent(transcribed_text, get_account_identifiers())
+                    if fallback:
+                        intent = fallback
+                        ss.debug_intent += f" (Fallback: {fallback} pattern match)"
+            except AttributeError:
+                # Fallback if classify_text is not available
                 try:
-                    # Use the intent analyzer to extract parameters
-                    intent_analysis = chatbot.intent_analyzer.analyze(user_input)
-                    
-                    # Extract parameters for the transfer
-                    params = intent_analysis.get("parameters", {})
-                    source_account_type = params.get("source_account_type")
-                    target_account_type = params.get("target_account_type")
-                    amount = params.get("amount")
-                    description = params.get("description", "Voice Transfer")
-                    
-                    # Validate we have the necessary parameters
-                    if not source_account_type or not target_account_type:
-                        return False, "I need to know which accounts to transfer between. Please specify your source and target accounts."
-                    
-                    if not amount:
-                        return False, "I need to know how much money to transfer. Please specify an amount."
-                    
-                    # Initialize MoneyTransfer class
-                    money_transfer = MoneyTransfer()
-                    
-                    # Execute the transfer
-                    result = money_transfer.transfer_money(
-                        source_user_id=user_id,
-                        target_user_id=user_id,  # Same user for both accounts
-                        amount=amount,
-                        source_account_type=source_account_type,
-                        target_account_type=target_account_type,
-                        description=description
-                    )
-                    
-                    # Check result and format response
-                    if result["status"] == "success":
-                        return True, f"I've successfully transferred ${amount:.2f} from your {source_account_type.replace('_', ' ').lower()} " \
-                              f"to your {target_account_type.replace('_', ' ').lower()}. " \
-                              f"Your new balance in the source account is ${result['source_balance']:.2f}."
-                    else:
-                        return False, f"I couldn't complete the transfer: {result['message']}. Please try again."
+                    intent = chatbot._classify_intent(transcribed_text)
+                    ss.debug_intent = f"Fallback intent: {intent}"
                     
+                    # Format intent for display
+                    if "_" in intent:
+                        intent = intent.replace("_", " ")
                 except Exception as e:
-                    LOGGER.error(f"Error in voice money transfer: {e}")
-                    return False, "I encountered an error while trying to process the transfer. Please try again or use the transfer form instead."
-
-            # Update the voice recording handling code to process money transfer intents
-            # Handling voice recording input
-            if voice_recording:
+                    ss.debug_intent = f"Error in intent classification: {str(e)}"
+                    intent = "default"
+            
+            # Check for money transfer intent
+            if intent == "Money_Transfer" or intent == "Money Transfer":
+                # Process as money transfer
                 try:
-                    # Initialize chatbot lazily on first use
-                    if chatbot is None:
-                        chatbot = get_chatbot_instance(user_id=st.session_state.current_user_id, user_fullname=st.session_state.user_fullname)
-                    
-                    # Prevent multiple runs of the same message
-                    current_time = time.time()
-                    if current_time - st.session_state.last_run_timestamp < 0.5:
-                        return
-                        
-                    st.session_state.last_run_timestamp = current_time
-                    
-                    # Log the voice recording received
-                    st.session_state.debug_audio = "Voice recording received"
-                    
-                    # Directly use voice_recording with our improved transcribe_audio function
-                    transcribed_text = transcribe_audio(voice_recording)
-                    
-                    # Add debug info
-                    if transcribed_text:
-                        st.session_state.debug_transcription = f"Transcribed text: {transcribed_text}"
-                    else:
-                        st.session_state.debug_transcription = "Transcription failed or returned empty"
-                        st.session_state.send_input = False  # Reset to prevent continuous reruns
-                        # Explicitly clear voice_recording widget from session state on failure
-                        if 'voice_recording' in st.session_state:
-                            del st.session_state['voice_recording']
-                        st.rerun()
-                        return
-                        
-                    # Create a hash of the message to track if it's been processed
-                    message_hash = f"{transcribed_text}:{st.session_state.current_user_id}"
-                    
-                    # Skip if this exact message has already been processed recently
-                    if message_hash in st.session_state.processed_messages:
-                        st.session_state.debug_transcription += " (Skipped - duplicate message)"
-                        st.session_state.send_input = False  # Reset to prevent continuous reruns
-                        # Explicitly clear voice_recording widget from session state to prevent reprocessing
-                        if 'voice_recording' in st.session_state:
-                            del st.session_state['voice_recording']
-                        st.rerun()
-                        return
-                        
-                    # Add to processed messages to prevent looping
-                    st.session_state.processed_messages.add(message_hash)
-                    
-                    # Limit size of processed messages set
-                    if len(st.session_state.processed_messages) > 20:
-                        # Keep only the 10 most recent messages
-                        st.session_state.processed_messages = set(list(st.session_state.processed_messages)[-10:])
-                    
-                    st.session_state.processing_message = True
-                    
-                    # Generate timestamp for this interaction
-                    timestamp = datetime.datetime.now().isoformat()
-                    
-                    # Add user message to chat history
-                    chat_history.add_user_message(transcribed_text)
-                    
-                    # Update chat history backup
-                    st.session_state[backup_key].append({"type": "human", "content": transcribed_text})
-                    
-                    # Get intent classification with fallback to _classify_intent if classify_text fails
-                    try:
-                        # Use standard classification first (embedding-based similarity)
-                        intent = chatbot.classify_text(transcribed_text)
-                        st.session_state.debug_intent = f"Classified intent: {intent}"
-                        
-                        # Format intent for display (replace underscores with spaces)
-                        if "_" in intent:
-                            intent = intent.replace("_", " ")
-                        
-                        # Only use pattern matching as fallback if embedding classification returned "default"
-                        if intent == "default":
-                            # Get all account types and names from user accounts if available
-                            account_types = []
-                            account_names = []
-                            
-                            if hasattr(st, 'session_state') and 'dashboard_context' in st.session_state:
-                                try:
-                                    # Extract accounts from dashboard context
-                                    if 'accounts' in st.session_state.dashboard_context:
-                                        accounts = st.session_state.dashboard_context.get('accounts', [])
-                                        # Extract all account types and names
-                                        for account in accounts:
-                                            if 'account_type' in account:
-                                                account_type = account['account_type'].lower().replace('_', ' ')
-                                                account_types.append(account_type)
-                                            if 'account_name' in account:
-                                                account_name = account['account_name'].lower()
-                                                account_names.append(account_name)
-                                except Exception as e:
-                                    # Log but don't break if error occurs
-                                    logging.error(f"Error extracting account types: {str(e)}")
-                            
-                            # If no account types found, fallback to standard types
-                            if not account_types:
-                                account_types = ['savings', 'checking', 'account']
-                            
-                            # Combine account names and types for pattern matching
-                            account_identifiers = account_types + account_names
-                            account_pattern = '|'.join(account_identifiers)
-                            
-                            # Check for account balance query patterns as fallback
-                            account_balance_patterns = [
-                                rf"how much (do|have) i (have )?in my ({account_pattern})",
-                                rf"what('s| is) my ({account_pattern}) (account )?balance",
-                                rf"balance in (my )?({account_pattern})",
-                                rf"how much money (do|have) i (have )?in (my )?({account_pattern})",
-                            ]
-                            
-                            # Check for spending patterns as fallback
-                            spending_patterns = [
-                                r"(which|what) category should i cut back",
-                                r"spending analytics",
-                                r"where (am i|are my) (over)?spending",
-                                r"category.*spend",
-                                r"spend.*category"
-                            ]
-                            
-                            # Direct pattern match only as fallback
-                            if any(re.search(pattern, transcribed_text.lower()) for pattern in account_balance_patterns):
-                                intent = "Account Inquiries"
-                                st.session_state.debug_intent += " (Fallback: Account Inquiries pattern match)"
-                            elif any(re.search(pattern, transcribed_text.lower()) for pattern in spending_patterns):
-                                intent = "Spending Analysis"
-                                st.session_state.debug_intent += " (Fallback: Spending Analysis pattern match)"
-                    except AttributeError:
-                        # Fallback if classify_text is not available
-                        try:
-                            intent = chatbot._classify_intent(transcribed_text)
-                            st.session_state.debug_intent = f"Fallback intent: {intent}"
-                            
-                            # Format intent for display
-                            if "_" in intent:
-                                intent = intent.replace("_", " ")
-                        except Exception as e:
-                            st.session_state.debug_intent = f"Error in intent classification: {str(e)}"
-                            intent = "default"
-                    
-                    # Check for money transfer intent
-                    if intent == "Money_Transfer" or intent == "Money Transfer":
-                        # Process as money transfer
-                        try:
-                            success, response = process_money_transfer_intent(chatbot, transcribed_text, st.session_state.current_user_id)
-                        except Exception as e:
-                            # If there's an error processing the money transfer, provide a helpful message
-                            response = f"I encountered an issue processing your money transfer request. Could you please rephrase it with the amount and accounts you want to transfer between?"
-                            logging.error(f"Error in money transfer processing: {str(e)}")
-                    else:
-                        # Get standard response with error handling
-                        try:
-                            response = chatbot.get_response(transcribed_text)
-                        except Exception as e:
-                            # Provide a helpful response if there's an error
-                            logging.error(f"Error getting chatbot response: {str(e)}")
-                            response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
-                    
-                    # Add AI response to chat history
-                    chat_history.add_ai_message(response)
-                    
-                    # Update chat history backup
-                    st.session_state[backup_key].append({"type": "ai", "content": response})
-                    
-                    # Convert to speech
-                    text_to_speech(response)
-                    
-                    # Store audio file in session state
-                    st.session_state.audio_file = "response.wav"
-                    st.session_state.last_intent = intent
-                    
-                    # Force refresh to update chat history
-                    current_time = datetime.datetime.now().timestamp()
-                    st.session_state.last_rerun = current_time
-                    
-                    # Store the current menu selection before rerun
-                    st.session_state.selected_menu = selected_menu
-                    
-                    # Reset send_input to prevent continuous reruns
-                    st.session_state.send_input = False
-                    
-                    # Explicitly clear voice_recording widget from session state after processing
-                    # This prevents the widget value from persisting and causing reruns
-                    if 'voice_recording' in st.session_state:
-                        del st.session_state['voice_recording']
-                    
-                    st.rerun()
+                    success, response = process_money_transfer_intent(chatbot, transcribed_text, ss.current_user_id)
                 except Exception as e:
-                    st.error(f"Error processing audio: {e}")
-                finally:
-                    # Always ensure processing_message is reset
-                    st.session_state.processing_message = False
-                    # Reset send_input even on error
-                    st.session_state.send_input = False
-                    # Clear voice_recording widget on error to prevent reprocessing
-                    if 'voice_recording' in st.session_state:
-                        del st.session_state['voice_recording']
-            
-            # Display debug info if it exists
-            if st.session_state.get('debug_audio') or st.session_state.get('debug_transcription'):
-                with st.expander("Voice Recording Debug Info (Click to hide)"):
-                    if st.session_state.get('debug_audio'):
-                        st.write(st.session_state.get('debug_audio'))
-                    if st.session_state.get('debug_transcription'):
-                        st.write(st.session_state.get('debug_transcription'))
-            
-            # Handling text input
-            if st.session_state.send_input and st.session_state.user_question:
+                    # If there's an error processing the money transfer, provide a helpful message
+                    response = f"I encountered an issue processing your money transfer request. Could you please rephrase it with the amount and accounts you want to transfer between?"
+                    logging.error(f"Error in money transfer processing: {str(e)}")
+            else:
+                # Get standard response with error handling
                 try:
-                    # Initialize chatbot lazily on first use
-                    if chatbot is None:
-                        chatbot = get_chatbot_instance(user_id=st.session_state.current_user_id, user_fullname=st.session_state.user_fullname)
-                    
-                    # Prevent multiple runs of the same message
-                    current_time = time.time()
-                    if current_time - st.session_state.last_run_timestamp < 0.5:
-                        return
-                        
-                    st.session_state.last_run_timestamp = current_time
-                    
-                    current_message = st.session_state.user_question
-                    
-                    # Create a hash of the message to track if it's been processed
-                    message_hash = f"{current_message}:{st.session_state.current_user_id}"
-                    
-                    # Skip if this exact message has already been processed recently
-                    if message_hash in st.session_state.processed_messages:
-                        st.session_state.user_question = ""  # Still clear the input
-                        st.session_state.send_input = False  # Reset send_input to prevent reruns
-                        return
-                        
-                    # Add to processed messages to prevent looping
-                    st.session_state.processed_messages.add(message_hash)
-                    
-                    # Limit size of processed messages set
-                    if len(st.session_state.processed_messages) > 20:
-                        # Keep only the 10 most recent messages
-                        st.session_state.processed_messages = set(list(st.session_state.processed_messages)[-10:])
-                    
-                    st.session_state.processing_message = True
-                    
-                    # Generate timestamp for this interaction
-                    timestamp = datetime.datetime.now().isoformat()
-                    
-                    # Add user message to chat history
-                    chat_history.add_user_message(current_message)
-                    
-                    # Update chat history backup
-                    st.session_state[backup_key].append({"type": "human", "content": current_message})
-                    
-                    # Get chatbot response
-                    # Check if we're on the Account Overview page and have chart data
-                    chart_context = None
-                    if selected_menu == "Account Overview" and "chart_data" in st.session_state:
-                        try:
-                            # Convert chart data to a readable format for the chatbot
-                            chart_data = st.session_state.chart_data
-                            
-                            # Ensure all required keys exist
-                            required_keys = ['checking_balance', 'savings_balance', 'credit_balance', 
-                                            'avg_income', 'avg_expenses', 'savings_rate',
-                                            'highest_expense_month', 'highest_expense_amount',
-                                            'lowest_expense_month', 'lowest_expense_amount',
-                                            'current_balance', 'balance_90day_high', 'balance_90day_high_date',
-                                            'balance_90day_low', 'balance_90day_low_date', 
-                                            'balance_monthly_trend_pct', 'spending_distribution', 'mortgage']
-                            
-                            # Check if all required keys exist
-                            missing_keys = [key for key in required_keys if key not in chart_data]
-                            
-                            if not missing_keys:
-                                chart_context = f"""
-                                Current account balances:
-                                - Checking: ${chart_data['checking_balance']:,.2f}
-                                - Savings: ${chart_data['savings_balance']:,.2f}
-                                - Credit Card: ${chart_data['credit_balance']:,.2f}
-                                
-                                Income vs Expenses:
-                                - Average monthly income: ${chart_data['avg_income']:,}
-                                - Average monthly expenses: ${chart_data['avg_expenses']:,}
-                                - Current savings rate: {chart_data['savings_rate']}%
-                                - Highest expense month: {chart_data['highest_expense_month']} (${chart_data['highest_expense_amount']:,})
-                                - Lowest expense month: {chart_data['lowest_expense_month']} (${chart_data['lowest_expense_amount']:,})
-                                
-                                Account Balance Trend:
-                                - Current balance: ${chart_data['current_balance']:,}
-                                - 90-day high: ${chart_data['balance_90day_high']:,} on {chart_data['balance_90day_high_date']}
-                                - 90-day low: ${chart_data['balance_90day_low']:,} on {chart_data['balance_90day_low_date']}
-                                - Monthly trend: {chart_data['balance_monthly_trend_pct']}% growth
-                                
-                                Spending Distribution:
-                                {'; '.join([f"{category}: {details['percentage']}% (${details['amount']:,})" 
-                                            for category, details in chart_data['spending_distribution'].items()])}
-                                
-                                Mortgage:
-                                - Original amount: ${chart_data['mortgage']['original_amount']:,}
-                                - Current balance: ${chart_data['mortgage']['current_balance']:,}
-                                - Paid off: ${chart_data['mortgage']['paid_off']:,} ({chart_data['mortgage']['paid_off_percentage']}%)
-                                - Monthly payment: ${chart_data['mortgage']['monthly_payment']:,}
-                                - Interest rate: {chart_data['mortgage']['interest_rate']}%
-                                """
-                            else:
-                                # Fall back to a simpler context if keys are missing
-                                chart_context = f"User is viewing their account dashboard with financial information."
-                        except Exception as e:
-                            # Log the error but continue without chart context
-                            logging.error(f"Error generating chart context: {str(e)}")
-                            chart_context = None
-                        
-                        # Pass chart context to chatbot
-                        try:
-                            response = chatbot.get_response(current_message, chart_context=chart_context)
-                        except Exception as e:
-                            # Provide a helpful response if there's an error
-                            logging.error(f"Error getting chatbot response with chart context: {str(e)}")
-                            response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
-                    else:
-                        # Standard response without chart context
-                        try:
-                            response = chatbot.get_response(current_message)
-                        except Exception as e:
-                            # Provide a helpful response if there's an error
-                            logging.error(f"Error getting chatbot response: {str(e)}")
-                            response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
-                    
-                    # Add AI response to chat history
-                    chat_history.add_ai_message(response)
-                    
-                    # Update chat history backup
-                    st.session_state[backup_key].append({"type": "ai", "content": response})
-                    
-                    # Get intent with fallback to _classify_intent if classify_text fails
-                    try:
-                        # Use standard classification first (embedding-based similarity)
-                        intent = chatbot.classify_text(current_message)
-                        st.session_state.debug_intent = f"Classified intent: {intent}"
-                        
-                        # Format intent for display (replace underscores with spaces)
-                        if "_" in intent:
-                            intent = intent.replace("_", " ")
-                        
-                        # Only use pattern matching as fallback if embedding classification returned "default"
-                        if intent == "default":
-                            # Get all account types and names from user accounts if available
-                            account_types = []
-                            account_names = []
-                            
-                            if hasattr(st, 'session_state') and 'dashboard_context' in st.session_state:
-                                try:
-                                    # Extract accounts from dashboard context
-                                    if 'accounts' in st.session_state.dashboard_context:
-                                        accounts = st.session_state.dashboard_context.get('accounts', [])
-                                        # Extract all account types and names
-                                        for account in accounts:
-                                            if 'account_type' in account:
-                                                account_type = account['account_type'].lower().replace('_', ' ')
-                                                account_types.append(account_type)
-                                            if 'account_name' in account:
-                                                account_name = account['account_name'].lower()
-                                                account_names.append(account_name)
-                                except Exception as e:
-                                    # Log but don't break if error occurs
-                                    logging.error(f"Error extracting account types: {str(e)}")
-                            
-                            # If no account types found, fallback to standard types
-                            if not account_types:
-                                account_types = ['savings', 'checking', 'account']
-                            
-                            # Combine account names and types for pattern matching
-                            account_identifiers = account_types + account_names
-                            account_pattern = '|'.join(account_identifiers)
-                            
-                            # Check for account balance query patterns as fallback
-                            account_balance_patterns = [
-                                rf"how much (do|have) i (have )?in my ({account_pattern})",
-                                rf"what('s| is) my ({account_pattern}) (account )?balance",
-                                rf"balance in (my )?({account_pattern})",
-                                rf"how much money (do|have) i (have )?in (my )?({account_pattern})",
-                            ]
-                            
-                            # Check for spending patterns as fallback
-                            spending_patterns = [
-                                r"(which|what) category should i cut back",
-                                r"spending analytics",
-                                r"where (am i|are my) (over)?spending",
-                                r"category.*spend",
-                                r"spend.*category"
-                            ]
-                            
-                            # Direct pattern match only as fallback
-                            if any(re.search(pattern, current_message.lower()) for pattern in account_balance_patterns):
-                                intent = "Account Inquiries"
-                                st.session_state.debug_intent += " (Fallback: Account Inquiries pattern match)"
-                            elif any(re.search(pattern, current_message.lower()) for pattern in spending_patterns):
-                                intent = "Spending Analysis"
-                                st.session_state.debug_intent += " (Fallback: Spending Analysis pattern match)"
-                    except AttributeError:
-                        # Fallback if classify_text is not available
-                        try:
-                            intent = chatbot._classify_intent(current_message)
-                            st.session_state.debug_intent = f"Fallback intent: {intent}"
-                            
-                            # Format intent for display
-                            if "_" in intent:
-                                intent = intent.replace("_", " ")
-                        except Exception as e:
-                            st.session_state.debug_intent = f"Error in intent classification: {str(e)}"
-                            intent = "default"
-                    
-                    # Convert to speech
-                    text_to_speech(response)
-                    
-                    # Store audio file in session state
-                    st.session_state.audio_file = "response.wav"
-                    st.session_state.last_intent = intent
-                    
-                    # Force refresh to update chat history
-                    current_time = datetime.datetime.now().timestamp()
-                    st.session_state.last_rerun = current_time
-                    
-                    # Store the current menu selection before rerun
-                    st.session_state.selected_menu = selected_menu
-                    
-                    # Reset send_input and user_question to prevent continuous reruns
-                    st.session_state.send_input = False
-                    st.session_state.user_question = ""
-                    
-                    st.rerun()
+                    response = stream_chat_reply(chat_container, chatbot, transcribed_text, speech)
                 except Exception as e:
-                    st.error(f"Error processing message: {e}")
-                finally:
-                    # Always ensure processing_message is reset
-                    st.session_state.processing_message = False
-                    # Reset send_input even on error
-                    st.session_state.send_input = False
-                    st.session_state.user_question = ""
-
-        # Get the selected menu from session state if available (to preserve during reruns)
-        if "selected_menu" in st.session_state:
-            selected_menu = st.session_state.selected_menu
+                    # Provide a helpful response if there's an error
+                    logging.error(f"Error getting chatbot response: {str(e)}")
+                    response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
             
-        # Handle different menu options (moved from earlier in the code)
-        if selected_menu == "Account Overview":
-            # Create a container for the dashboard to ensure it's always rendered
-            dashboard_container = st.container()
+            # Add AI response to chat history
+            chat_history.add_ai_message(response)
             
-            with dashboard_container:
-                # Use the new account dashboard functionality
-                # Ensure dashboard is displayed regardless of chat interactions
-                dashboard_data = display_account_dashboard(
-                    user_id=st.session_state.current_user_id,
-                    user_fullname=st.session_state.user_fullname
-                )
-                
-                # Store dashboard context in session state for the chatbot to use
-                if dashboard_data:
-                    st.session_state.dashboard_context = {
-                        'user_fullname': st.session_state.user_fullname,
-                        'user_id': st.session_state.current_user_id,
-                        'total_accounts': dashboard_data.get('total_accounts', 0),
-                        'total_assets': dashboard_data.get('total_assets', 0),
-                        'total_liabilities': dashboard_data.get('total_liabilities', 0),
-                        'selected_account': dashboard_data.get('selected_account', 'All Accounts'),
-                        'selected_time_period': dashboard_data.get('selected_time_period', 'Last 30 days'),
-                        'chart_data': dashboard_data.get('chart_data', {})
-                    }
-                    
-                    # Store chart_data directly for easier access, preserving existing data
-                    chart_data = dashboard_data.get('chart_data', {})
-                    if "chart_data" in st.session_state:
-                        # Merge new chart data with existing data
-                        st.session_state.chart_data.update(chart_data)
-                    else:
-                        # First time setting chart data
-                        st.session_state.chart_data = chart_data
-        
-        elif selected_menu == "Money Transfer":
-            st.header("Money Transfer")
+            # Update chat history backup
+            backup.append({"type": "ai", "content": response})
+            trim_chat_history(chat_history, backup_key)
             
-            # Initialize money transfer module
-            money_transfer = MoneyTransfer()
+            # Convert to speech, reusing sentences already synthesized during streaming
+            speech.save(response)
             
-            # Check for redirects from previous actions
-            if 'redirect_to_overview' in st.session_state and st.session_state.redirect_to_overview:
-                # Clear the redirect flag
-                st.session_state.redirect_to_overview = False
-                # Set the selected menu to Account Overview
-                st.session_state.previous_menu = selected_menu
-                selected_menu = "Account Overview"
-                st.rerun()
+            # Store audio file in session state
+            ss.audio_file = "response.wav"
+            ss.last_intent = intent
             
-            st.subheader("Transfer Money Between Accounts")
+            # Force refresh to update chat history
+            ss.last_rerun = time.monotonic()
             
-            col1, col2 = st.columns(2)
+            # Store the current menu selection before rerun
+            ss.selected_menu = selected_menu
             
-            with col1:
-                st.markdown("### From")
-                # Source user selection (default to current user)
-                users = get_user_select_options(money_transfer)
-                source_user_id = st.selectbox(
-                    "Source User", 
-                    options=[user['value'] for user in users],
-                    format_func=lambda x: next((user['label'] for user in users if user['value'] == x), x),
-                    index=[i for i, user in enumerate(users) if user['value'] == st.session_state.current_user_id][0] if 'current_user_id' in st.session_state else 0,
-                    key="source_user"
-                )
-                
-                # Source account selection
-                source_accounts = get_account_select_options(money_transfer, source_user_id)
-                if not source_accounts:
-                    st.warning(f"No accounts found for selected user.")
-                    source_account_type = None
-                else:
-                    source_account_type = st.selectbox(
-                        "Source Account",
-                        options=[account['value'] for account in source_accounts],
-                        format_func=lambda x: next((account['label'] for account in source_accounts if account['value'] == x), x),
-                        key="source_account"
-                    )
+            # Reset send_input to prevent continuous reruns
+            ss.send_input = False
             
-            with col2:
-                st.markdown("### To")
-                # Target user selection
-                target_user_id = st.selectbox(
-                    "Target User", 
-                    options=[user['value'] for user in users],
-                    format_func=lambda x: next((user['label'] for user in users if user['value'] == x), x),
-                    key="target_user"
-                )
+            # Explicitly clear voice_recording widget from session state after processing
+            # This prevents the widget value from persisting and causing reruns
+            if 'voice_recording' in ss:
+                del ss['voice_recording']
+            
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error processing audio: {e}")
+        finally:
+            # Always ensure processing_message is reset
+            ss.processing_message = False
+            # Reset send_input even on error
+            ss.send_input = False
+            # Clear voice_recording widget on error to prevent reprocessing
+            if 'voice_recording' in ss:
+                del ss['voice_recording']
+    
+    # Display debug info if it exists
+    render_voice_debug(debug_placeholder)
+    
+    # Handling text input
+    if st.session_state.send_input and st.session_state.user_question:
+        try:
+            # Initialize chatbot lazily on first use
+            if chatbot is None:
+                chatbot = get_session_chatbot()
+            
+            # Prevent multiple runs of the same message
+            current_time = time.time()
+            if current_time - st.session_state.last_run_timestamp < 0.5:
+                return
                 
-                # Target account selection
-                target_accounts = get_account_select_options(money_transfer, target_user_id)
-                if not target_accounts:
-                    st.warning(f"No accounts found for selected user.")
-                    target_account_type = None
-                else:
-                    target_account_type = st.selectbox(
-                        "Target Account",
-                        options=[account['value'] for account in target_accounts],
-                        format_func=lambda x: next((account['label'] for account in target_accounts if account['value'] == x), x),
-                        key="target_account"
-                    )
+            st.session_state.last_run_timestamp = current_time
             
-            # Amount and description
-            amount_str = st.text_input("Amount ($)", placeholder="Enter amount e.g. 100.00")
-            description = st.text_input("Description (Optional)", placeholder="Enter description")
+            current_message = st.session_state.user_question
             
-            # Show validation information to guide users
-            if amount_str:
-                amount_valid, amount_result = validate_transfer_input(amount_str)
-                if not amount_valid:
-                    st.warning(amount_result)
-                elif float(amount_result) > 1000:
-                    st.info("Note: Large transfers may require additional verification.")
+            # Create a hash of the message to track if it's been processed
+            message_hash = message_digest(current_message, st.session_state.current_user_id)
             
-            # Check if both source and target accounts are selected before showing the transfer button
-            transfer_disabled = (source_account_type is None or target_account_type is None or 
-                               source_user_id == target_user_id and source_account_type == target_account_type)
+            # Skip if this exact message has already been processed recently; otherwise record it
+            if is_duplicate_message(message_hash):
+                st.session_state.user_question = ""  # Still clear the input
+                st.session_state.send_input = False  # Reset send_input to prevent reruns
+                return
             
-            # Transfer button with helpful tooltip
-            transfer_btn = st.button(
-                "Transfer Money", 
-                disabled=transfer_disabled,
-                help="Transfer funds between accounts. Both source and target accounts must be selected."
-            )
+            st.session_state.processing_message = True
+            
+            # Collects speech for the reply while it streams
+            speech = StreamingSpeech()
             
-            if transfer_disabled and source_user_id == target_user_id and source_account_type == target_account_type:
-                st.warning("Cannot transfer money to the same account")
+            # Add user message to chat history
+            chat_history.add_user_message(current_message)
+            
+            # Update chat history backup
+            st.session_state[backup_key].append({"type": "human", "content": current_message})
+            
+            # Get chatbot response
+            # Check if we're on the Account Overview page and have chart data
+            chart_context = None
+            if selected_menu == "Account Overview" and "chart_data" in st.session_state:
+                try:
+                    chart_context = get_chart_context()
+                except Exception as e:
+                    # Log the error but continue without chart context
+                    logging.error(f"Error generating chart context: {str(e)}")
+                    chart_context = None
                 
-            # Process transfer
-            if transfer_btn:
-                # Validate amount
-                amount_valid, amount_result = validate_transfer_input(amount_str)
+                # Pass chart context to chatbot
+                try:
+                    response = stream_chat_reply(chat_container, chatbot, current_message, speech, chart_context=chart_context)
+                except Exception as e:
+                    # Provide a helpful response if there's an error
+                    logging.error(f"Error getting chatbot response with chart context: {str(e)}")
+                    response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
+            else:
+                # Standard response without chart context
+                try:
+                    response = stream_chat_reply(chat_container, chatbot, current_message, speech)
+                except Exception as e:
+                    # Provide a helpful response if there's an error
+                    logging.error(f"Error getting chatbot response: {str(e)}")
+                    response = "I'm sorry, I couldn't process that request. Could you please rephrase your question?"
+            
+            # Add AI response to chat history
+            chat_history.add_ai_message(response)
+            
+            # Update chat history backup
+            st.session_state[backup_key].append({"type": "ai", "content": response})
+            trim_chat_history(chat_history, backup_key)
+            
+            # Get intent with fallback to _classify_intent if classify_text fails
+            try:
+                # Use standard classification first (embedding-based similarity)
+                intent = classify_message(current_message, dashboard_has_spending_chart(), chatbot)
+                st.session_state.debug_intent = f"Classified intent: {intent}"
                 
-                if not amount_valid:
-                    st.error(amount_result)
-                else:
-                    # Show progress indicator during processing
-                    with st.spinner("Processing transfer..."):
-                        # Process transfer
-                        result = money_transfer.transfer_money(
-                            source_user_id,
-                            target_user_id,
-                            amount_result,
-                            source_account_type,
-                            target_account_type,
-                            description
-                        )
+                # Format intent for display (replace underscores with spaces)
+                if "_" in intent:
+                    intent = intent.replace("_", " ")
+                
+                # Only use pattern matching as fallback if embedding classification returned "default"
+                if intent == "default":
+                    fallback = fallback_intent(current_message, get_account_identifiers())
+                    if fallback:
+                        intent = fallback
+                        st.session_state.debug_intent += f" (Fallback: {fallback} pattern match)"
+            except AttributeError:
+                # Fallback if classify_text is not available
+                try:
+                    intent = chatbot._classify_intent(current_message)
+                    st.session_state.debug_intent = f"Fallback intent: {intent}"
                     
-                    if result["status"] == "success":
-                        # Success feedback with better formatting
-                        st.success(result["message"])
-                        
-                        # Create a container for the transfer details
-                        with st.container():
-                            st.markdown("### Transfer Details")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.info(f"💰 Source Balance: ${result['source_balance']:.2f}")
-                            with col2:
-                                st.info(f"💰 Target Balance: ${result['target_balance']:.2f}")
-                            
-                            st.markdown(f"Transaction ID: `{result['transaction_id']}`")
-                            st.markdown(f"Date: `{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`")
-                            
-                            # Add options to view updated accounts or make another transfer
-                            st.markdown("### What's next?")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                if st.button("View Account Overview"):
-                                    # Set session state to redirect to account overview
-                                    st.session_state.redirect_to_overview = True
-                                    st.rerun()
-                            with col2:
-                                if st.button("Make Another Transfer"):
-                                    # Clear form fields for a new transfer
-                                    st.session_state.pop('source_account', None)
-                                    st.session_state.pop('target_user', None)
-                                    st.session_state.pop('target_account', None)
-                                    st.rerun()
-                    else:
-                        # More detailed error feedback
-                        st.error(result["message"])
-                        if "code" in result and result["code"] == "INSUFFICIENT_FUNDS":
-                            # Show accounts with sufficient funds if available
-                            sufficient_accounts = money_transfer.get_accounts_with_sufficient_funds(
-                                source_user_id, amount_result)
-                            if sufficient_accounts:
-                                st.markdown("#### Accounts with sufficient funds:")
-                                for acct in sufficient_accounts:
-                                    st.info(
-                                        f"• {acct['account_name']} ({acct['account_type']}): " + 
-                                        f"${acct['balance']:.2f} {acct['currency']}"
-                                    )
-                        elif "code" in result and result["code"] == "SYSTEM_ERROR":
-                            st.warning("A system error occurred. Please try again later or contact support.")
+                    # Format intent for display
+                    if "_" in intent:
+                        intent = intent.replace("_", " ")
+                except Exception as e:
+                    st.session_state.debug_intent = f"Error in intent classification: {str(e)}"
+                    intent = "default"
             
-            # Transfer History with better formatting
-            st.markdown("---")
-            st.subheader("Recent Transfers")
-            history_tab1, history_tab2 = st.tabs(["Sent", "Received"])
+            # Convert to speech, reusing sentences already synthesized during streaming
+            speech.save(response)
             
-            # Helper function to format the transfer history
-            def display_transfer_history(transfers_df, direction):
-                if not transfers_df.empty:
-                    # Create a more user-friendly display
-                    for index, row in transfers_df.iterrows():
-                        with st.container():
-                            col1, col2 = st.columns([1, 2])
-                            with col1:
-                                st.markdown(f"**{row['date']}**")
-                                amount_str = row['amount']
-                                if direction == "sent":
-                                    st.markdown(f"📤 `{amount_str}`")
-                                else:
-                                    st.markdown(f"📥 `{amount_str}`")
-                            with col2:
-                                st.markdown(f"**{row['description']}**")
-                                if 'balance_after' in row:
-                                    st.markdown(f"Balance after: ${row['balance_after']:.2f}")
-                                st.markdown(f"ID: {row['transaction_id']}")
-                            st.markdown("---")
-                else:
-                    if direction == "sent":
-                        st.info("No outgoing transfers found")
-                    else:
-                        st.info("No incoming transfers found")
+            # Store audio file in session state
+            st.session_state.audio_file = "response.wav"
+            st.session_state.last_intent = intent
             
-            # Get user's transfer history
-            transfer_history = money_transfer.get_transfer_history(st.session_state.current_user_id)
+            # Force refresh to update chat history
+            st.session_state.last_rerun = time.monotonic()
             
-            # Display sent transfers
-            with history_tab1:
-                if transfer_history["status"] == "success" and "transfers" in transfer_history and len(transfer_history["transfers"]) > 0:
-                    try:
-                        transfers_df = pd.DataFrame(transfer_history["transfers"])
-                        # Filter only outgoing transfers (negative amounts)
-                        outgoing = transfers_df[transfers_df["amount"].str.contains("-")]
-                        # Sort by date, most recent first
-                        if not outgoing.empty and 'date' in outgoing.columns:
-                            try:
-                                # Sort if possible
-                                outgoing = outgoing.sort_values('date', ascending=False)
-                            except Exception as e:
-                                LOGGER.warning(f"Could not sort by date: {e}")
-                        display_transfer_history(outgoing, "sent")
-                    except Exception as e:
-                        LOGGER.warning(f"Unable to display transfer history: {str(e)}")
-                        st.info("No outgoing transfers found")
+            # Store the current menu selection before rerun
+            st.session_state.selected_menu = selected_menu
+            
+            # Reset send_input and user_question to prevent continuous reruns
+            st.session_state.send_input = False
+            st.session_state.user_question = ""
+            
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error processing message: {e}")
+        finally:
+            # Always ensure processing_message is reset
+            st.session_state.processing_message = False
+            # Reset send_input even on error
+            st.session_state.send_input = False
+            st.session_state.user_question = ""
+
+def render_account_overview(uid, fullname):
+    """Render the Account Overview page and share its context with the chatbot."""
+    # Create a container for the dashboard to ensure it's always rendered
+    dashboard_container = st.container()
+    
+    with dashboard_container:
+        # Import the account dashboard module only when the overview is shown
+        from modules.account_dashboard import display_account_dashboard
+        
+        # Use the new account dashboard functionality
+        # Ensure dashboard is displayed regardless of chat interactions
+        dashboard_data = display_account_dashboard(
+            user_id=uid,
+            user_fullname=fullname
+        )
+        
+        # Store dashboard context in session state for the chatbot to use
+        if dashboard_data:
+            st.session_state.dashboard_context = {
+                'user_fullname': fullname,
+                'user_id': uid,
+                'total_accounts': dashboard_data.get('total_accounts', 0),
+                'total_assets': dashboard_data.get('total_assets', 0),
+                'total_liabilities': dashboard_data.get('total_liabilities', 0),
+                'selected_account': dashboard_data.get('selected_account', 'All Accounts'),
+                'selected_time_period': dashboard_data.get('selected_time_period', 'Last 30 days'),
+                'chart_data': dashboard_data.get('chart_data', {})
+            }
+            
+            # Refresh the intent fallback's account identifiers and the chart data only when the
+            # accounts or the dashboard's chart data change
+            accounts = dashboard_data.get('accounts', [])
+            account_signature = tuple((account.get('account_type'), account.get('account_name')) for account in accounts)
+            dashboard_signature = (account_signature, st.session_state.get('dashboard_chart_signature'))
+            if st.session_state.get('dashboard_signature') != dashboard_signature:
+                st.session_state.account_identifiers = extract_account_identifiers(accounts)
+                
+                # Store chart_data directly for easier access, preserving existing data
+                chart_data = dashboard_data.get('chart_data', {})
+                if "chart_data" in st.session_state:
+                    # Merge new chart data with existing data
+                    st.session_state.chart_data.update(chart_data)
                 else:
-                    status_message = transfer_history.get("message", "No transfer history available")
-                    st.info(status_message)
+                    # First time setting chart data
+                    st.session_state.chart_data = chart_data
+                st.session_state.dashboard_signature = dashboard_signature
+
+@st.cache_resource
+def get_money_transfer():
+    """Create the MoneyTransfer instance shared across reruns and sessions.
+    
+    Hold its lock around every use, calling reload_if_changed first when the latest data is needed.
+    """
+    from modules.money_transfer import MoneyTransfer
+    return MoneyTransfer()
+
+def data_file_mtime(path):
+    """Return a file's modification time, or None if it does not exist, for use in cache keys."""
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_transfer_user_options(users_mtime, _money_transfer):
+    """Return the user options for the transfer form; users_mtime keys the cache on the users file."""
+    from modules.money_transfer import get_user_select_options
+    with _money_transfer.lock:
+        _money_transfer.reload_if_changed()
+        return get_user_select_options(_money_transfer)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_transfer_account_options(user_id, accounts_mtime, _money_transfer):
+    """Return a user's account options for the transfer form; accounts_mtime keys the cache on the accounts file."""
+    from modules.money_transfer import get_account_select_options
+    with _money_transfer.lock:
+        _money_transfer.reload_if_changed()
+        return get_account_select_options(_money_transfer, user_id)
+
+def render_money_transfer(uid, fullname):
+    """Render the Money Transfer page."""
+    st.header("Money Transfer")
+    
+    # Initialize money transfer module
+    from modules.money_transfer import validate_transfer_input
+    money_transfer = get_money_transfer()
+    
+    # Pick up transfers written by other sessions or by the chat since the data was loaded
+    with money_transfer.lock:
+        money_transfer.reload_if_changed()
+    accounts_mtime = data_file_mtime(money_transfer.accounts_file)
+    
+    # Check for redirects from previous actions
+    if 'redirect_to_overview' in st.session_state and st.session_state.redirect_to_overview:
+        # Clear the redirect flag
+        st.session_state.redirect_to_overview = False
+        # Remember where we came from and go back to the overview
+        st.session_state.previous_menu = "Money Transfer"
+        st.rerun()
+    
+    st.subheader("Transfer Money Between Accounts")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### From")
+        # Source user selection (default to current user)
+        users = get_transfer_user_options(data_file_mtime(money_transfer.users_file), money_transfer)
+        source_user_id = st.selectbox(
+            "Source User", 
+            options=[user['value'] for user in users],
+            format_func=lambda x: next((user['label'] for user in users if user['value'] == x), x),
+            index=[i for i, user in enumerate(users) if user['value'] == uid][0],
+            key="source_user"
+        )
+        
+        # Source account selection
+        source_accounts = get_transfer_account_options(source_user_id, accounts_mtime, money_transfer)
+        if not source_accounts:
+            st.warning(f"No accounts found for selected user.")
+            source_account_type = None
+        else:
+            source_account_type = st.selectbox(
+                "Source Account",
+                options=[account['value'] for account in source_accounts],
+                format_func=lambda x: next((account['label'] for account in source_accounts if account['value'] == x), x),
+                key="source_account"
+            )
+    
+    with col2:
+        st.markdown("### To")
+        # Target user selection
+        target_user_id = st.selectbox(
+            "Target User", 
+            options=[user['value'] for user in users],
+            format_func=lambda x: next((user['label'] for user in users if user['value'] == x), x),
+            key="target_user"
+        )
+        
+        # Target account selection
+        target_accounts = get_transfer_account_options(target_user_id, accounts_mtime, money_transfer)
+        if not target_accounts:
+            st.warning(f"No accounts found for selected user.")
+            target_account_type = None
+        else:
+            target_account_type = st.selectbox(
+                "Target Account",
+                options=[account['value'] for account in target_accounts],
+                format_func=lambda x: next((account['label'] for account in target_accounts if account['value'] == x), x),
+                key="target_account"
+            )
+    
+    # Amount and description
+    amount_str = st.text_input("Amount ($)", placeholder="Enter amount e.g. 100.00")
+    description = st.text_input("Description (Optional)", placeholder="Enter description")
+    
+    # Show validation information to guide users
+    if amount_str:
+        amount_valid, amount_result = validate_transfer_input(amount_str)
+        if not amount_valid:
+            st.warning(amount_result)
+        elif float(amount_result) > 1000:
+            st.info("Note: Large transfers may require additional verification.")
+    
+    # Check if both source and target accounts are selected before showing the transfer button
+    transfer_disabled = (source_account_type is None or target_account_type is None or 
+                       source_user_id == target_user_id and source_account_type == target_account_type)
+    
+    # Transfer button with helpful tooltip
+    transfer_btn = st.button(
+        "Transfer Money", 
+        disabled=transfer_disabled,
+        help="Transfer funds between accounts. Both source and target accounts must be selected."
+    )
+    
+    if transfer_disabled and source_user_id == target_user_id and source_account_type == target_account_type:
+        st.warning("Cannot transfer money to the same account")
+        
+    # Process transfer
+    if transfer_btn:
+        # Validate amount
+        amount_valid, amount_result = validate_transfer_input(amount_str)
+        
+        if not amount_valid:
+            st.error(amount_result)
+        else:
+            # Show progress indicator during processing
+            with st.spinner("Processing transfer..."), money_transfer.lock:
+                # Process transfer against the latest balances
+                money_transfer.reload_if_changed()
+                result = money_transfer.transfer_money(
+                    source_user_id,
+                    target_user_id,
+                    amount_result,
+                    source_account_type,
+                    target_account_type,
+                    description
+                )
             
-            # Display received transfers
-            with history_tab2:
-                if transfer_history["status"] == "success" and "transfers" in transfer_history and len(transfer_history["transfers"]) > 0:
+            if result["status"] == "success":
+                # Balances changed, so refresh the account options on the next rerun
+                get_transfer_account_options.clear()
+                
+                # Success feedback with better formatting
+                st.success(result["message"])
+                
+                # Create a container for the transfer details
+                with st.container():
+                    st.markdown("### Transfer Details")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.info(f"💰 Source Balance: ${result['source_balance']:.2f}")
+                    with col2:
+                        st.info(f"💰 Target Balance: ${result['target_balance']:.2f}")
+                    
+                    st.markdown(f"Transaction ID: `{result['transaction_id']}`")
+                    st.markdown(f"Date: `{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`")
+                    
+                    # Add options to view updated accounts or make another transfer
+                    st.markdown("### What's next?")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("View Account Overview"):
+                            # Set session state to redirect to account overview
+                            st.session_state.redirect_to_overview = True
+                            st.rerun()
+                    with col2:
+                        if st.button("Make Another Transfer"):
+                            # Clear form fields for a new transfer
+                            st.session_state.pop('source_account', None)
+                            st.session_state.pop('target_user', None)
+                            st.session_state.pop('target_account', None)
+                            st.rerun()
+            else:
+                # More detailed error feedback
+                st.error(result["message"])
+                if "code" in result and result["code"] == "INSUFFICIENT_FUNDS":
+                    # Show accounts with sufficient funds if available
+                    with money_transfer.lock:
+                        sufficient_accounts = money_transfer.get_accounts_with_sufficient_funds(
+                            source_user_id, amount_result)
+                    if sufficient_accounts:
+                        st.markdown("#### Accounts with sufficient funds:")
+                        for acct in sufficient_accounts:
+                            st.info(
+                                f"• {acct['account_name']} ({acct['account_type']}): " + 
+                                f"${acct['balance']:.2f} {acct['currency']}"
+                            )
+                elif "code" in result and result["code"] == "SYSTEM_ERROR":
+                    st.warning("A system error occurred. Please try again later or contact support.")
+    
+    # Transfer History with better formatting
+    st.markdown("---")
+    st.subheader("Recent Transfers")
+    history_tab1, history_tab2 = st.tabs(["Sent", "Received"])
+    
+    # Helper function to format the transfer history
+    def display_transfer_history(transfers_df, direction):
+        if not transfers_df.empty:
+            # Create a more user-friendly display
+            for index, row in transfers_df.iterrows():
+                with st.container():
+                    col1, col2 = st.columns([1, 2])
+                    with col1:
+                        st.markdown(f"**{row['date']}**")
+                        amount_str = row['amount']
+                        if direction == "sent":
+                            st.markdown(f"📤 `{amount_str}`")
+                        else:
+                            st.markdown(f"📥 `{amount_str}`")
+                    with col2:
+                        st.markdown(f"**{row['description']}**")
+                        if 'balance_after' in row:
+                            st.markdown(f"Balance after: ${row['balance_after']:.2f}")
+                        st.markdown(f"ID: {row['transaction_id']}")
+                    st.markdown("---")
+        else:
+            if direction == "sent":
+                st.info("No outgoing transfers found")
+            else:
+                st.info("No incoming transfers found")
+    
+    # Get user's transfer history
+    with money_transfer.lock:
+        transfer_history = money_transfer.get_transfer_history(uid)
+    
+    # Display sent transfers
+    with history_tab1:
+        if transfer_history["status"] == "success" and "transfers" in transfer_history and len(transfer_history["transfers"]) > 0:
+            try:
+                transfers_df = pd.DataFrame(transfer_history["transfers"])
+                # Filter only outgoing transfers (negative amounts)
+                outgoing = transfers_df[transfers_df["amount"].str.contains("-")]
+                # Sort by date, most recent first
+                if not outgoing.empty and 'date' in outgoing.columns:
                     try:
-                        transfers_df = pd.DataFrame(transfer_history["transfers"])
-                        # Filter only incoming transfers (positive amounts)
-                        incoming = transfers_df[~transfers_df["amount"].str.contains("-")]
-                        # Sort by date, most recent first
-                        if not incoming.empty and 'date' in incoming.columns:
-                            try:
-                                # Sort if possible
-                                incoming = incoming.sort_values('date', ascending=False)
-                            except Exception as e:
-                                LOGGER.warning(f"Could not sort by date: {e}")
-                        display_transfer_history(incoming, "received")
+                        # Sort if possible
+                        outgoing = outgoing.sort_values('date', ascending=False)
                     except Exception as e:
-                        LOGGER.warning(f"Unable to display transfer history: {str(e)}")
-                        st.info("No incoming transfers found")
-                else:
-                    status_message = transfer_history.get("message", "No transfer history available")
-                    st.info(status_message)
+                        LOGGER.warning(f"Could not sort by date: {e}")
+                display_transfer_history(outgoing, "sent")
+            except Exception as e:
+                LOGGER.warning(f"Unable to display transfer history: {str(e)}")
+                st.info("No outgoing transfers found")
+        else:
+            status_message = transfer_history.get("message", "No transfer history available")
+            st.info(status_message)
+    
+    # Display received transfers
+    with history_tab2:
+        if transfer_history["status"] == "success" and "transfers" in transfer_history and len(transfer_history["transfers"]) > 0:
+            try:
+                transfers_df = pd.DataFrame(transfer_history["transfers"])
+                # Filter only incoming transfers (positive amounts)
+                incoming = transfers_df[~transfers_df["amount"].str.contains("-")]
+                # Sort by date, most recent first
+                if not incoming.empty and 'date' in incoming.columns:
+                    try:
+                        # Sort if possible
+                        incoming = incoming.sort_values('date', ascending=False)
+                    except Exception as e:
+                        LOGGER.warning(f"Could not sort by date: {e}")
+                display_transfer_history(incoming, "received")
+            except Exception as e:
+                LOGGER.warning(f"Unable to display transfer history: {str(e)}")
+                st.info("No incoming transfers found")
+        else:
+            status_message = transfer_history.get("message", "No transfer history available")
+            st.info(status_message)
+
+def render_financial_advice(uid, fullname):
+    """Render the Financial Advice page."""
+    # Import the financial advice implementation
+    from financial_advice import render_financial_advice_page
+    
+    # Render the financial advice page with the current user's ID and name
+    render_financial_advice_page(
+        user_id=uid,
+        user_fullname=fullname
+    )
+
+# Page renderer for each sidebar menu option
+MENU_PAGES = {
+    "Account Overview": render_account_overview,
+    "Money Transfer": render_money_transfer,
+    "Financial Advice": render_financial_advice
+}
+
+def main():
+    # Load CSS once per session
+    if "css_loaded" not in st.session_state:
+        load_css()
+        st.session_state.css_loaded = True
+    
+    # Set app title
+    st.title("AletaBanc Copilot")
+    
+    # Initialize session state once
+    initialize_session_state()
+    
+    # Display authentication sidebar
+    display_auth_sidebar()
+    
+    # Check if user is authenticated
+    if "authenticated" not in st.session_state or not st.session_state.authenticated:
+        st.info("Please log in to access the banking assistant.")
+        st.markdown(WELCOME_MARKDOWN)
+        return
+    
+    uid = st.session_state.current_user_id
+    fullname = st.session_state.user_fullname
+    
+    # Initializing chat history with enhanced persistence and user-specific key
+    # The history handle is created once per session and reused across reruns
+    user_history_key = f'history_{uid}'
+    history_obj_key = f'chat_history_obj_{uid}'
+    if history_obj_key not in st.session_state:
+        st.session_state[history_obj_key] = StreamlitChatMessageHistory(key=user_history_key)
+    chat_history = st.session_state[history_obj_key]
+    
+    # Ensure we have a user-specific backup list
+    backup_key = f'chat_history_backup_{uid}'
+    backup = st.session_state.setdefault(backup_key, [])
+    
+    # If chat history is empty but we have a backup, restore it (once per session)
+    restored_key = f'history_restored_{uid}'
+    if restored_key not in st.session_state:
+        if backup and not chat_history.messages:
+            chat_history.add_messages([
+                HumanMessage(content=msg['content']) if msg['type'] == 'human' else AIMessage(content=msg['content'])
+                for msg in backup
+                if msg['type'] in ('human', 'ai')
+            ])
+        st.session_state[restored_key] = True
+    
+    # Add sidebar menu
+    st.sidebar.subheader("Navigation")
+    
+    # Menu options - Removed Transaction History and Spending Analytics as they're now part of Account Overview
+    menu_options = [
+        "Account Overview",  
+        "Money Transfer",
+        "Financial Advice"
+    ]
+    
+    selected_menu = st.sidebar.radio("Select a feature", menu_options)
+    
+    # Store the menu selection in session state to preserve it during reruns
+    st.session_state.selected_menu = selected_menu
+    
+    # Add a button to clear chat history
+    if st.sidebar.button("Clear Chat History"):
+        clear_chat_history()
+
+    # Only show chat input, recording, and chat history in Account Overview
+    if selected_menu != "Money Transfer" and selected_menu != "Financial Advice":
+        render_chat_panel(chat_history, backup_key, selected_menu)
+
+    # Get the selected menu from session state if available (to preserve during reruns)
+    if "selected_menu" in st.session_state:
+        selected_menu = st.session_state.selected_menu
         
-        elif selected_menu == "Financial Advice":
-            # Import the financial advice implementation
-            from financial_advice import render_financial_advice_page
-            
-            # Render the financial advice page with the current user's ID and name
-            render_financial_advice_page(
-                user_id=st.session_state.current_user_id,
-                user_fullname=st.session_state.user_fullname
-            )
+    # Handle different menu options (moved from earlier in the code)
+    MENU_PAGES[selected_menu](uid, fullname)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
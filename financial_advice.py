@@ -355,11 +355,9 @@ Important guidelines:
         market_data = self.get_market_data()
         
         if market_data:
-            # Create a stylish table for market indices
-            market_df = pd.DataFrame(market_data)
-            
-            # Style the market data display
-            for idx, row in market_df.iterrows():
+            # Style the market data display (rows are read straight from the list of dicts;
+            # no DataFrame is needed just to loop over them)
+            for row in market_data:
                 col1, col2, col3 = st.columns([2, 1, 1])
                 with col1:
                     st.write(f"**{row['index']}**")
@@ -1,12 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import os
 import uuid
 import logging
-import altair as alt
 import time
 
 # Configure logging - only if not already configured
@@ -18,6 +18,233 @@ if not logging.getLogger().handlers:
     )
 LOGGER = logging.getLogger('account_dashboard')
 
+# Line charts with more points than this are rendered with WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+# Dashboard time period choices (label -> days)
+TIME_PERIOD_OPTIONS = {
+    "Last 30 days": 30,
+    "Last 60 days": 60,
+    "Last 90 days": 90,
+    "Last 6 months": 180,
+    "Last year": 365
+}
+TIME_PERIOD_LABELS = tuple(TIME_PERIOD_OPTIONS)
+
+# Displayed columns and their headers for the dashboard tables
+ACCOUNT_DISPLAY_COLUMNS = ['account_name', 'account_type', 'balance', 'available_balance',
+                           'interest_rate', 'open_date', 'status']
+ACCOUNT_COLUMN_CONFIG = {
+    "account_name": "Account Name",
+    "account_type": "Type",
+    "balance": "Balance",
+    "available_balance": "Available",
+    "interest_rate": "Interest Rate",
+    "open_date": "Opened On",
+    "status": "Status"
+}
+SCHEDULED_PAYMENT_COLUMN_CONFIG = {
+    "payee_name": "Recipient",
+    "amount": "Amount",
+    "frequency": "Frequency",
+    "next_date": "Next Date",
+    "category": "Category",
+    "description": "Description"
+}
+TRANSACTION_DISPLAY_COLUMNS = ['date', 'description', 'category', 'formatted_amount',
+                               'balance_after', 'merchant_name', 'transaction_type']
+TRANSACTION_COLUMN_CONFIG = {
+    "date": "Date & Time",
+    "description": "Description",
+    "category": "Category",
+    "formatted_amount": "Amount",
+    "balance_after": "Balance After",
+    "merchant_name": "Merchant",
+    "transaction_type": "Type"
+}
+
+# Trend series passed to the chatbot context are thinned to about this many points
+CONTEXT_MAX_POINTS = 50
+
+# Files under the data directory the dashboard reads
+DATA_FILES = ['accounts.csv', 'transaction_history.csv', 'users.csv', 'scheduled_payments.csv']
+
+# Explicit dtypes so CSV parsing doesn't have to infer them
+ACCOUNTS_DTYPES = {'balance': 'float64', 'available_balance': 'float64', 'interest_rate': 'float64'}
+TRANSACTIONS_DTYPES = {'amount': 'float64', 'balance_after': 'float64'}
+SCHEDULED_PAYMENTS_DTYPES = {'amount': 'float64'}
+
+# Transaction columns the dashboard actually reads; the rest (currency, status, location, ...)
+# stay on disk and are never materialized
+TRANSACTIONS_COLUMNS = ['account_id', 'date', 'description', 'category', 'amount',
+                        'balance_after', 'merchant_name', 'transaction_type']
+
+# Low-cardinality string columns stored as categoricals (integer codes instead of Python strings)
+TRANSACTIONS_CATEGORICAL_COLUMNS = ['account_id', 'category', 'transaction_type', 'merchant_name', 'description']
+
+# History kept in memory, counted back from the newest transaction; comfortably covers the
+# longest dashboard window ("Last year")
+TRANSACTIONS_RETENTION_DAYS = 400
+
+# CSVs larger than this are parsed in chunks so older rows are dropped before the whole file is in memory
+CHUNKED_READ_THRESHOLD_BYTES = 64 * 1024 * 1024
+CSV_CHUNK_ROWS = 200_000
+
+
+def _to_categorical(df, columns):
+    """Convert the given columns (where present) to the pandas category dtype."""
+    for col in columns or []:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _monthly_income_expenses(dates, amounts):
+    """Sum income and expenses per calendar month.
+
+    Months are encoded as consecutive integers (year * 12 + month) so both sums come
+    out of a single np.bincount pass each, however long the history is.
+    """
+    valid = dates.notna().to_numpy()
+    dates = dates[valid]
+    if dates.empty:
+        return pd.DataFrame(columns=['month', 'income', 'expenses'])
+    
+    # Missing amounts count as zero, as in a skipna sum
+    amount = np.nan_to_num(amounts.to_numpy(dtype='float64')[valid])
+    month_code = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+    first_month = month_code.min()
+    offset = month_code - first_month
+    
+    income = np.bincount(offset, weights=np.clip(amount, 0, None))
+    expenses = np.bincount(offset, weights=np.clip(-amount, 0, None))
+    
+    # Keep only months that actually have transactions (ascending)
+    present = np.bincount(offset) > 0
+    codes = np.flatnonzero(present) + first_month
+    return pd.DataFrame({
+        'month': [f"{code // 12:04d}-{code % 12 + 1:02d}" for code in codes],
+        'income': income[present],
+        'expenses': expenses[present]
+    })
+
+
+def _records(df):
+    """Equivalent of ``df.to_dict('records')`` built column-wise (one tolist() per column)."""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[col].tolist() for col in columns))]
+
+
+def _downsample(df, value_column, max_points=CONTEXT_MAX_POINTS):
+    """Thin a time series to about ``max_points`` evenly spaced rows.
+
+    The first and last rows and the rows holding the minimum and maximum of
+    ``value_column`` are always kept, so range and extremes survive.
+    """
+    if len(df) <= max_points:
+        return df
+    keep = np.zeros(len(df), dtype=bool)
+    keep[::-(-len(df) // max_points)] = True
+    keep[[0, -1]] = True
+    values = df[value_column].to_numpy(dtype='float64')
+    if not np.isnan(values).all():
+        keep[np.nanargmax(values)] = keep[np.nanargmin(values)] = True
+    return df[keep]
+
+
+def _drop_old_rows(df, date_column, newest_date, recent_days):
+    """Drop rows more than ``recent_days`` older than ``newest_date`` (rows without a date are kept)."""
+    if pd.isna(newest_date) or not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        return df
+    cutoff = newest_date - pd.Timedelta(days=recent_days)
+    return df[df[date_column].isna() | (df[date_column] >= cutoff)]
+
+
+def _read_recent_csv_chunks(csv_path, dtype, parse_dates, date_column, recent_days):
+    """Read a large CSV in chunks, keeping only rows within ``recent_days`` of its newest date.
+
+    The newest date is only known once the whole file has been read, so every chunk is
+    trimmed against the newest date seen so far; anything dropped that way is also older
+    than the final cutoff.
+    """
+    newest_date = pd.NaT
+    chunks = []
+    for chunk in pd.read_csv(csv_path, dtype=dtype, parse_dates=parse_dates, chunksize=CSV_CHUNK_ROWS):
+        chunk_newest = chunk[date_column].max() if pd.api.types.is_datetime64_any_dtype(chunk[date_column]) else pd.NaT
+        if pd.notna(chunk_newest) and (pd.isna(newest_date) or chunk_newest > newest_date):
+            newest_date = chunk_newest
+        chunks.append(_drop_old_rows(chunk, date_column, newest_date, recent_days))
+    
+    df = pd.concat(chunks, ignore_index=True)
+    return _drop_old_rows(df, date_column, newest_date, recent_days).reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False)
+def _load_table(csv_path, csv_mtime, dtype=None, parse_dates=None, categorical_columns=None, columns=None,
+                recent_days=None):
+    """Load a CSV file through a sibling Parquet cache that is rebuilt whenever the CSV is newer.
+
+    ``csv_mtime`` is only used as part of the cache key so that edits to the CSV
+    (e.g. after a money transfer) invalidate the in-memory cache as well. When
+    ``columns`` is given only those columns are read from the (full) Parquet copy.
+    When ``recent_days`` is given, rows older than that many days before the newest
+    date in the first ``parse_dates`` column are dropped while parsing.
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    
+    # Fast path: the Parquet copy is at least as recent as the CSV
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= csv_mtime:
+        try:
+            return _to_categorical(pd.read_parquet(parquet_path, engine='pyarrow', columns=columns),
+                                   categorical_columns)
+        except Exception as e:
+            LOGGER.warning(f"Could not read Parquet cache {parquet_path}, falling back to CSV: {e}")
+    
+    date_column = parse_dates[0] if recent_days and parse_dates else None
+    if date_column and os.path.getsize(csv_path) > CHUNKED_READ_THRESHOLD_BYTES:
+        # Large history: stream it so peak memory stays around one chunk plus the retained window
+        df = _read_recent_csv_chunks(csv_path, dtype, parse_dates, date_column, recent_days)
+    else:
+        # Parse with the multi-threaded PyArrow CSV reader, falling back to the default parser
+        # for anything it rejects
+        try:
+            df = pd.read_csv(csv_path, engine='pyarrow', dtype=dtype, parse_dates=parse_dates)
+        except Exception as e:
+            LOGGER.warning(f"PyArrow CSV reader failed for {csv_path}, using default parser: {e}")
+            df = pd.read_csv(csv_path, dtype=dtype, parse_dates=parse_dates)
+        if date_column in df.columns and pd.api.types.is_datetime64_any_dtype(df[date_column]):
+            df = _drop_old_rows(df, date_column, df[date_column].max(), recent_days).reset_index(drop=True)
+    df = _to_categorical(df, categorical_columns)
+    
+    # Refresh the Parquet copy for the next cold load (non-fatal if the directory is read-only).
+    # All columns are kept on disk; column selection happens on read.
+    try:
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False, row_group_size=100_000)
+    except Exception as e:
+        LOGGER.warning(f"Could not write Parquet cache {parquet_path}: {e}")
+    
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+def _default_data_dir():
+    """Locate the data directory: one level up from modules/, else ./data."""
+    possible_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    if not os.path.exists(possible_path):
+        possible_path = 'data'
+    return possible_path
+
+
+def _data_files_version(data_dir):
+    """Modification times of the dashboard's data files (None for missing ones)."""
+    version = [os.path.abspath(data_dir)]
+    for name in DATA_FILES:
+        path = os.path.join(data_dir, name)
+        version.append(os.path.getmtime(path) if os.path.exists(path) else None)
+    return tuple(version)
+
+
 class AccountDashboard:
     """Class to handle account overview, transaction history, and spending analytics."""
     
@@ -25,16 +252,8 @@ class AccountDashboard:
         """Initialize with data directory path."""
         # Set up data directory similar to MoneyTransfer class
         if data_dir is None:
-            # Try going up one level from modules/ to root, then to data/
-            possible_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-            
-            if not os.path.exists(possible_path):
-                possible_path = 'data'
-                LOGGER.info(f"Using direct path to data directory: {os.path.abspath(possible_path)}")
-            else:
-                LOGGER.info(f"Using calculated path to data directory: {possible_path}")
-            
-            self.data_dir = possible_path
+            self.data_dir = _default_data_dir()
+            LOGGER.info(f"Using data directory: {os.path.abspath(self.data_dir)}")
         else:
             self.data_dir = data_dir
             LOGGER.info(f"Using provided data directory: {data_dir}")
@@ -49,6 +268,18 @@ class AccountDashboard:
     
     def load_data(self):
         """Load accounts, transactions and user data from CSV files."""
+        # Cache key for the memoized per-user derivations; only set once loading succeeds
+        self._data_version = None
+        # account_id -> account_type lookup, shared by the per-user derivations
+        self._account_type_by_id = pd.Series(dtype=object)
+        # account_id -> row positions in the date-sorted transactions frame
+        self._transaction_rows_by_account = {}
+        # Hot transaction columns as plain NumPy arrays aligned with the sorted transactions
+        # frame, so the per-user kernels never walk the frame's string columns
+        self._transaction_arrays = {}
+        # owner_id -> that user's accounts frame / account_id array
+        self._accounts_by_owner = {}
+        self._account_ids_by_owner = {}
         try:
             # Log the file paths we're trying to load
             LOGGER.info(f"Loading accounts from: {self.accounts_file}")
@@ -68,26 +299,67 @@ class AccountDashboard:
                 LOGGER.error(f"Users file does not exist: {self.users_file}")
                 raise FileNotFoundError(f"Users file not found: {self.users_file}")
             
-            # Load the data
-            self.accounts = pd.read_csv(self.accounts_file)
-            self.transactions = pd.read_csv(self.transactions_file)
-            self.users = pd.read_csv(self.users_file)
+            # Load the data (cached on disk as Parquet and in memory, keyed by CSV modification time)
+            accounts_mtime = os.path.getmtime(self.accounts_file)
+            transactions_mtime = os.path.getmtime(self.transactions_file)
+            self.accounts = _load_table(self.accounts_file, accounts_mtime, dtype=ACCOUNTS_DTYPES)
+            self.transactions = _load_table(self.transactions_file, transactions_mtime,
+                                            dtype=TRANSACTIONS_DTYPES, parse_dates=['date'],
+                                            categorical_columns=TRANSACTIONS_CATEGORICAL_COLUMNS,
+                                            columns=TRANSACTIONS_COLUMNS,
+                                            recent_days=TRANSACTIONS_RETENTION_DAYS)
+            self.users = _load_table(self.users_file, os.path.getmtime(self.users_file))
             
             # Try to load scheduled payments if they exist
             if os.path.exists(self.scheduled_payments_file):
-                self.scheduled_payments = pd.read_csv(self.scheduled_payments_file)
+                self.scheduled_payments = _load_table(self.scheduled_payments_file,
+                                                      os.path.getmtime(self.scheduled_payments_file),
+                                                      dtype=SCHEDULED_PAYMENTS_DTYPES)
                 LOGGER.info(f"Loaded {len(self.scheduled_payments)} scheduled payments")
             else:
                 LOGGER.warning(f"Scheduled payments file not found: {self.scheduled_payments_file}")
                 self.scheduled_payments = pd.DataFrame()
             
-            # Convert date columns to datetime
-            if 'date' in self.transactions.columns:
+            # Convert date columns to datetime (only needed if parse_dates couldn't parse them)
+            if 'date' in self.transactions.columns and not pd.api.types.is_datetime64_any_dtype(self.transactions['date']):
                 try:
                     self.transactions['date'] = pd.to_datetime(self.transactions['date'], errors='coerce')
                 except Exception as e:
                     LOGGER.error(f"Error converting transaction dates to datetime: {e}")
             
+            # Build the account type lookup once instead of on every query
+            if {'account_id', 'account_type'}.issubset(self.accounts.columns):
+                self._account_type_by_id = (
+                    self.accounts.drop_duplicates('account_id', keep='last')
+                    .set_index('account_id')['account_type']
+                )
+            
+            # Sort transactions by date once (newest first) so every per-user slice
+            # inherits that order instead of being re-sorted on each query
+            if 'date' in self.transactions.columns:
+                self.transactions = self.transactions.sort_values(
+                    'date', ascending=False, kind='stable', na_position='last'
+                ).reset_index(drop=True)
+            
+            self._transaction_arrays = self._build_transaction_arrays()
+            
+            # Index transaction row positions by account and accounts by owner so
+            # per-user lookups are hash hits rather than full-column scans
+            if 'account_id' in self.transactions.columns:
+                self._transaction_rows_by_account = self.transactions.groupby('account_id', observed=True).indices
+            if 'owner_id' in self.accounts.columns:
+                self._accounts_by_owner = {
+                    owner_id: owner_accounts.reset_index(drop=True)
+                    for owner_id, owner_accounts in self.accounts.groupby('owner_id', sort=False)
+                }
+                if 'account_id' in self.accounts.columns:
+                    self._account_ids_by_owner = {
+                        owner_id: owner_accounts['account_id'].to_numpy()
+                        for owner_id, owner_accounts in self._accounts_by_owner.items()
+                    }
+            
+            self._data_version = (os.path.abspath(self.data_dir), accounts_mtime, transactions_mtime)
+            
             LOGGER.info(f"Loaded {len(self.accounts)} accounts, {len(self.transactions)} transactions")
             LOGGER.info(f"Loaded {len(self.users)} users")
             
@@ -108,136 +380,155 @@ class AccountDashboard:
     def get_user_accounts(self, user_id):
         """Get all accounts for a specific user."""
         if not self.accounts.empty:
-            user_accounts = self.accounts[self.accounts['owner_id'] == user_id]
-            return user_accounts
+            return self._accounts_by_owner.get(user_id, self.accounts.iloc[:0])
         return pd.DataFrame()
     
     def get_user_transactions(self, user_id, days=30, account_type=None):
         """Get transaction history for a user, optionally filtered by account type and time period."""
-        if self.transactions.empty:
-            return pd.DataFrame()
-        
+        return _cached_user_transactions(self, self._data_version, user_id, days, account_type)
+    
+    def _build_transaction_arrays(self):
+        """Extract the columns used by the per-user kernels as NumPy arrays."""
+        arrays = {}
+        if 'date' in self.transactions.columns and pd.api.types.is_datetime64_any_dtype(self.transactions['date']):
+            arrays['date'] = self.transactions['date'].to_numpy()
+        for col in ['amount', 'balance_after']:
+            if col in self.transactions.columns:
+                arrays[col] = pd.to_numeric(self.transactions[col], errors='coerce').to_numpy(dtype='float64')
+        if 'category' in self.transactions.columns and isinstance(self.transactions['category'].dtype, pd.CategoricalDtype):
+            arrays['category_code'] = self.transactions['category'].cat.codes.to_numpy()
+        if 'account_id' in self.transactions.columns and isinstance(self.transactions['account_id'].dtype, pd.CategoricalDtype):
+            # Account type per transaction, looked up through the account_id category codes
+            account_ids = self.transactions['account_id']
+            type_by_code = self._account_type_by_id.reindex(account_ids.cat.categories).to_numpy(dtype=object)
+            codes = account_ids.cat.codes.to_numpy()
+            arrays['account_type'] = np.where(codes >= 0, type_by_code[codes] if len(type_by_code) else None, None)
+        return arrays
+    
+    def _get_user_transaction_positions(self, user_id, days, account_type):
+        """Row positions (newest first) of a user's transactions, or None if the user has no matching accounts."""
         # Get all user accounts
         user_accounts = self.get_user_accounts(user_id)
         if user_accounts.empty:
-            return pd.DataFrame()
+            return None
         
         # Filter by account type if specified
         if account_type:
             user_accounts = user_accounts[user_accounts['account_type'] == account_type]
             if user_accounts.empty:
-                return pd.DataFrame()
+                return None
+            account_ids = user_accounts['account_id'].to_numpy()
+        else:
+            account_ids = self._account_ids_by_owner.get(user_id, user_accounts['account_id'].to_numpy())
         
-        # Get account IDs to filter transactions
-        account_ids = user_accounts['account_id'].tolist()
+        # Gather the row positions of these accounts; taking them in ascending order
+        # keeps the master frame's newest-first date order
+        account_rows = [self._transaction_rows_by_account[account_id] for account_id in account_ids
+                        if account_id in self._transaction_rows_by_account]
+        positions = np.sort(np.concatenate(account_rows)) if account_rows else np.empty(0, dtype=np.intp)
         
-        # Filter transactions by account IDs
-        user_transactions = self.transactions[self.transactions['account_id'].isin(account_ids)].copy()
+        # Filter by date if needed, on the positions themselves so the frame is only
+        # materialized once
+        if days > 0 and 'date' in self._transaction_arrays:
+            # Since we're working with example data, use the max date in the dataset as "today";
+            # rows are newest first with missing dates (NaT) last, so that's the first row
+            dates = self._transaction_arrays['date'][positions]
+            if len(dates) and not np.isnat(dates[0]):
+                # NaT never passes the comparison
+                start_date = dates[0] - np.timedelta64(days, 'D')
+                positions = positions[dates >= start_date]
+            else:
+                positions = positions[:0]
         
-        # Add account type for each transaction
-        if not user_accounts.empty:
-            # Create a mapping of account_id to account_type
-            account_type_map = user_accounts.set_index('account_id')['account_type'].to_dict()
-            
-            # Add account_type column to transactions
-            user_transactions['account_type'] = user_transactions['account_id'].map(account_type_map)
+        return positions
+    
+    def _get_user_transactions(self, user_id, days, account_type):
+        if self.transactions.empty:
+            return pd.DataFrame()
         
-        # Filter by date if needed
-        if days > 0 and 'date' in user_transactions.columns:
-            # Handle possible NaT values
-            user_transactions = user_transactions.dropna(subset=['date'])
-            
-            # Get current date and filter by date range
-            # Since we're working with example data, use the max date in the dataset as "today"
-            latest_date = user_transactions['date'].max()
-            if pd.notna(latest_date):
-                start_date = latest_date - pd.Timedelta(days=days)
-                user_transactions = user_transactions[user_transactions['date'] >= start_date]
+        positions = self._get_user_transaction_positions(user_id, days, account_type)
+        if positions is None:
+            return pd.DataFrame()
+        
+        # Already sorted by date (descending) from load_data
+        user_transactions = self.transactions.take(positions)
         
-        # Sort by date (descending)
-        if 'date' in user_transactions.columns:
-            user_transactions = user_transactions.sort_values('date', ascending=False)
+        # Add account type for each transaction
+        user_transactions['account_type'] = user_transactions['account_id'].map(self._account_type_by_id)
         
         return user_transactions
     
     def get_user_spending_by_category(self, user_id, days=30, account_type=None):
         """Get spending analytics by category for a user."""
-        # Get user transactions
-        transactions = self.get_user_transactions(user_id, days, account_type)
+        return _cached_spending_by_category(self, self._data_version, user_id, days, account_type)
+    
+    def _get_user_spending_by_category(self, user_id, days, account_type):
+        if self.transactions.empty:
+            return pd.DataFrame()
         
-        if transactions.empty:
+        positions = self._get_user_transaction_positions(user_id, days, account_type)
+        if positions is None or len(positions) == 0:
             return pd.DataFrame()
         
-        # Filter only debit/expense transactions (negative amounts)
-        if 'amount' in transactions.columns:
-            # Convert amount to numeric if it's a string
-            if transactions['amount'].dtype == 'object':
-                transactions['amount'] = pd.to_numeric(transactions['amount'], errors='coerce')
-            
-            # Filter only negative amounts (expenses)
-            expenses = transactions[transactions['amount'] < 0].copy()
-            
-            # Take absolute value for better visualization
-            expenses['amount'] = expenses['amount'].abs()
-            
-            # Group by category
-            if 'category' in expenses.columns:
-                category_spending = expenses.groupby('category')['amount'].sum().reset_index()
-                
-                # Sort by highest spending
-                category_spending = category_spending.sort_values('amount', ascending=False)
-                
-                return category_spending
+        if 'amount' not in self._transaction_arrays or 'category_code' not in self._transaction_arrays:
+            return pd.DataFrame()
         
-        return pd.DataFrame()
+        # Only negative amounts (expenses) with a category (code -1 means missing)
+        amounts = self._transaction_arrays['amount'][positions]
+        codes = self._transaction_arrays['category_code'][positions]
+        is_expense = (amounts < 0) & (codes >= 0)
+        codes = codes[is_expense]
+        
+        # Sum straight over the category codes, taking absolute values for better visualization
+        categories = self.transactions['category'].cat.categories
+        sums = np.bincount(codes, weights=-amounts[is_expense], minlength=len(categories))
+        observed = np.bincount(codes, minlength=len(categories)) > 0
+        category_spending = pd.DataFrame({
+            'category': categories[observed],
+            'amount': sums[observed]
+        })
+        
+        # Sort by highest spending
+        return category_spending.sort_values('amount', ascending=False)
     
     def get_account_balance_trend(self, user_id, account_type=None, days=90, exclude_mortgage=False):
         """Calculate balance trend over time based on transactions."""
-        # Get user transactions
-        transactions = self.get_user_transactions(user_id, days, account_type)
+        return _cached_balance_trend(self, self._data_version, user_id, account_type, days, exclude_mortgage)
+    
+    def _get_account_balance_trend(self, user_id, account_type, days, exclude_mortgage):
+        if self.transactions.empty:
+            return pd.DataFrame()
         
-        if transactions.empty or 'balance_after' not in transactions.columns:
+        positions = self._get_user_transaction_positions(user_id, days, account_type)
+        if positions is None or len(positions) == 0:
             return pd.DataFrame()
         
-        # Convert to numeric if needed
-        if transactions['balance_after'].dtype == 'object':
-            transactions['balance_after'] = pd.to_numeric(transactions['balance_after'], errors='coerce')
+        if 'balance_after' not in self._transaction_arrays or 'date' not in self._transaction_arrays:
+            return pd.DataFrame()
         
-        # Group by date and get the last balance of each day
-        if 'date' in transactions.columns:
-            # Extract just the date part
-            transactions['date_only'] = transactions['date'].dt.date
-            
-            # Get account types for each transaction
-            # We need to merge the account type from accounts DataFrame
-            if 'account_id' in transactions.columns and not self.accounts.empty:
-                # Create a mapping of account_id to account_type
-                account_type_map = self.accounts.set_index('account_id')['account_type'].to_dict()
-                
-                # Add account_type column to transactions
-                transactions['account_type'] = transactions['account_id'].map(account_type_map)
-                
-                # Filter out mortgage accounts if needed
-                if exclude_mortgage:
-                    transactions = transactions[transactions['account_type'] != 'MORTGAGE']
-            
-            # Check if we should filter by account type
-            if account_type and 'account_type' in transactions.columns:
-                transactions = transactions[transactions['account_type'] == account_type]
-            
-            # Group by date and get the last balance of each day
-            # Use the first balance of each day (since we've sorted descending)
-            daily_balance = transactions.groupby('date_only')['balance_after'].first().reset_index()
-            
-            # Sort by date (ascending for trend line)
-            daily_balance = daily_balance.sort_values('date_only')
-            
-            return daily_balance
+        # Filter out mortgage accounts if needed
+        if exclude_mortgage and 'account_type' in self._transaction_arrays:
+            positions = positions[self._transaction_arrays['account_type'][positions] != 'MORTGAGE']
         
-        return pd.DataFrame()
+        dates = self._transaction_arrays['date'][positions]
+        has_date = ~np.isnat(dates)
+        dates = dates[has_date]
+        balances = self._transaction_arrays['balance_after'][positions][has_date]
+        
+        # Rows are newest first, so the first row of each day is that day's latest
+        # transaction; np.unique returns the days in ascending order (for the trend line)
+        days_only, first_rows = np.unique(dates.astype('datetime64[D]'), return_index=True)
+        
+        return pd.DataFrame({
+            'date_only': days_only.astype(dates.dtype),
+            'balance_after': balances[first_rows]
+        })
     
     def get_monthly_income_vs_expenses(self, user_id, months=6, account_type=None):
         """Calculate monthly income vs expenses."""
+        return _cached_monthly_income_vs_expenses(self, self._data_version, user_id, months, account_type)
+    
+    def _get_monthly_income_vs_expenses(self, user_id, months, account_type):
         # Get user transactions
         transactions = self.get_user_transactions(user_id, days=months*30, account_type=account_type)
         
@@ -248,29 +539,9 @@ class AccountDashboard:
         if transactions['amount'].dtype == 'object':
             transactions['amount'] = pd.to_numeric(transactions['amount'], errors='coerce')
         
-        # Add month column
         if 'date' in transactions.columns:
-            transactions['month'] = transactions['date'].dt.strftime('%Y-%m')
-            
             # Calculate income (positive amounts) and expenses (negative amounts) by month
-            monthly_summary = pd.DataFrame()
-            
-            # Group by month
-            grouped = transactions.groupby('month')
-            
-            # Calculate income and expenses for each month
-            monthly_data = []
-            for month, group in grouped:
-                income = group[group['amount'] > 0]['amount'].sum()
-                expenses = group[group['amount'] < 0]['amount'].abs().sum()
-                monthly_data.append({'month': month, 'income': income, 'expenses': expenses})
-            
-            monthly_summary = pd.DataFrame(monthly_data)
-            
-            # Sort by month
-            monthly_summary = monthly_summary.sort_values('month')
-            
-            return monthly_summary
+            return _monthly_income_expenses(transactions['date'], transactions['amount'])
         
         return pd.DataFrame()
     
@@ -286,6 +557,9 @@ class AccountDashboard:
             st.error(f"No accounts found for user {user_id}")
             return
         
+        # Chart data shared with the chatbot; stays None for charts that aren't built
+        balance_trend = mortgage_trend = category_spending = monthly_data = None
+        
         # Create tabs for the dashboard sections
         overview_tab, transactions_tab, analytics_tab = st.tabs([
             "Account Overview", 
@@ -298,9 +572,11 @@ class AccountDashboard:
             st.subheader("Dashboard Controls")
             
             # Account selection
+            account_names = user_accounts['account_name'].to_numpy()
+            account_types = user_accounts['account_type'].to_numpy()
             account_options = [("All Accounts", None)] + [
-                (f"{row['account_name']} ({row['account_type']})", row['account_type']) 
-                for _, row in user_accounts.iterrows()
+                (f"{name} ({acct_type})", acct_type)
+                for name, acct_type in zip(account_names, account_types)
             ]
             selected_account_label, selected_account_type = account_options[
                 st.selectbox(
@@ -311,15 +587,8 @@ class AccountDashboard:
             ]
             
             # Time period selection
-            time_options = {
-                "Last 30 days": 30,
-                "Last 60 days": 60,
-                "Last 90 days": 90,
-                "Last 6 months": 180,
-                "Last year": 365
-            }
-            selected_time_label = st.selectbox("Time Period", options=list(time_options.keys()))
-            selected_time_days = time_options[selected_time_label]
+            selected_time_label = st.selectbox("Time Period", options=TIME_PERIOD_LABELS)
+            selected_time_days = TIME_PERIOD_OPTIONS[selected_time_label]
         
         # Account Overview Tab
         with overview_tab:
@@ -362,24 +631,14 @@ class AccountDashboard:
                 display_accounts['interest_rate'] = display_accounts['interest_rate'].astype(float).map('{:.2f}%'.format)
             
             # Select and order columns for display
-            display_cols = ['account_name', 'account_type', 'balance', 'available_balance', 
-                         'interest_rate', 'open_date', 'status']
             display_accounts = display_accounts[
-                [col for col in display_cols if col in display_accounts.columns]
+                [col for col in ACCOUNT_DISPLAY_COLUMNS if col in display_accounts.columns]
             ]
             
             # Display account table
             st.dataframe(
                 display_accounts,
-                column_config={
-                    "account_name": "Account Name",
-                    "account_type": "Type",
-                    "balance": "Balance",
-                    "available_balance": "Available",
-                    "interest_rate": "Interest Rate",
-                    "open_date": "Opened On",
-                    "status": "Status"
-                },
+                column_config=ACCOUNT_COLUMN_CONFIG,
                 use_container_width=True
             )
             
@@ -396,20 +655,11 @@ class AccountDashboard:
             
             if not balance_trend.empty:
                 # Create line chart
-                fig = px.line(
-                    balance_trend, 
-                    x='date_only', 
-                    y='balance_after',
-                    labels={'date_only': 'Date', 'balance_after': 'Balance'},
-                    title=f"Asset Balance History - {selected_account_label}"
-                )
-                fig.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Balance ($)",
-                    hovermode="x unified"
+                fig = _balance_trend_figure(
+                    balance_trend,
+                    (self._data_version, user_id, selected_account_type, selected_time_days, True),
+                    f"Asset Balance History - {selected_account_label}"
                 )
-                # Add dollar signs to y-axis
-                fig.update_layout(yaxis=dict(tickprefix="$"))
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Insufficient data to display balance trend.")
@@ -427,20 +677,11 @@ class AccountDashboard:
                 
                 if not mortgage_trend.empty:
                     # Create line chart for mortgage balance
-                    fig = px.line(
+                    fig = _balance_trend_figure(
                         mortgage_trend,
-                        x='date_only',
-                        y='balance_after',
-                        labels={'date_only': 'Date', 'balance_after': 'Balance'},
-                        title="Mortgage Balance History"
-                    )
-                    fig.update_layout(
-                        xaxis_title="Date",
-                        yaxis_title="Balance ($)",
-                        hovermode="x unified"
+                        (self._data_version, user_id, "MORTGAGE", selected_time_days, False),
+                        "Mortgage Balance History"
                     )
-                    # Add dollar signs to y-axis
-                    fig.update_layout(yaxis=dict(tickprefix="$"))
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.info("Insufficient data to display mortgage trend.")
@@ -460,22 +701,16 @@ class AccountDashboard:
                     ]
                     
                     if not user_scheduled.empty:
-                        # Format for display
-                        for col in ['amount']:
-                            if col in user_scheduled.columns:
-                                user_scheduled[col] = user_scheduled[col].astype(float).map('${:,.2f}'.format)
+                        # Format for display (on a new frame rather than writing into the filtered slice)
+                        if 'amount' in user_scheduled.columns:
+                            user_scheduled = user_scheduled.assign(
+                                amount=user_scheduled['amount'].astype(float).map('${:,.2f}'.format)
+                            )
                         
                         # Display upcoming payments
                         st.dataframe(
                             user_scheduled,
-                            column_config={
-                                "payee_name": "Recipient",
-                                "amount": "Amount",
-                                "frequency": "Frequency",
-                                "next_date": "Next Date",
-                                "category": "Category",
-                                "description": "Description"
-                            },
+                            column_config=SCHEDULED_PAYMENT_COLUMN_CONFIG,
                             use_container_width=True
                         )
                     else:
@@ -501,57 +736,44 @@ class AccountDashboard:
             # Display transaction count
             st.write(f"Showing {len(transactions)} transactions for {selected_account_label}")
             
-            # Format transactions for display
-            display_transactions = transactions.copy()
+            # Format only the columns that need it, without copying the whole frame
+            formatted = {}
             
             # Format date
-            if 'date' in display_transactions.columns:
-                display_transactions['date'] = display_transactions['date'].dt.strftime('%Y-%m-%d %H:%M')
+            if 'date' in transactions.columns:
+                formatted['date'] = transactions['date'].dt.strftime('%Y-%m-%d %H:%M')
             
             # Format amount
-            if 'amount' in display_transactions.columns:
+            if 'amount' in transactions.columns:
                 # Convert to float first if needed
-                display_transactions.loc[:, 'amount'] = pd.to_numeric(display_transactions['amount'], errors='coerce')
-                
-                # Apply color coding
-                def format_amount(value):
-                    if pd.isna(value):
-                        return ""
-                    elif value < 0:
-                        return f"📤 ${abs(value):,.2f}"
-                    else:
-                        return f"📥 ${value:,.2f}"
+                amount = pd.to_numeric(transactions['amount'], errors='coerce')
                 
-                display_transactions.loc[:, 'formatted_amount'] = display_transactions['amount'].apply(format_amount)
+                # Apply color coding (outgoing vs incoming), leaving missing amounts blank
+                amount_str = amount.abs().map('${:,.2f}'.format)
+                formatted['formatted_amount'] = np.where(
+                    amount.isna(), "",
+                    np.where(amount < 0, "📤 " + amount_str, "📥 " + amount_str)
+                )
             
             # Format balance
-            if 'balance_after' in display_transactions.columns:
-                display_transactions['balance_after'] = pd.to_numeric(
-                    display_transactions['balance_after'], errors='coerce'
+            if 'balance_after' in transactions.columns:
+                formatted['balance_after'] = pd.to_numeric(
+                    transactions['balance_after'], errors='coerce'
                 ).map('${:,.2f}'.format)
             
-            # Select columns for display
-            display_cols = ['date', 'description', 'category', 'formatted_amount', 
-                         'balance_after', 'merchant_name', 'transaction_type']
-            
-            # Ensure all columns exist
-            display_cols = [col for col in display_cols if col in display_transactions.columns]
+            # Select columns for display, ensuring all columns exist
+            display_cols = [col for col in TRANSACTION_DISPLAY_COLUMNS
+                            if col in transactions.columns or col in formatted]
             
-            # Create dataframe with selected columns
-            display_df = display_transactions[display_cols]
+            # Project the unformatted display columns, then add the formatted ones
+            display_df = transactions[
+                [col for col in display_cols if col not in formatted]
+            ].assign(**formatted)[display_cols]
             
             # Display transaction table
             st.dataframe(
                 display_df,
-                column_config={
-                    "date": "Date & Time",
-                    "description": "Description",
-                    "category": "Category",
-                    "formatted_amount": "Amount",
-                    "balance_after": "Balance After",
-                    "merchant_name": "Merchant",
-                    "transaction_type": "Type"
-                },
+                column_config=TRANSACTION_COLUMN_CONFIG,
                 use_container_width=True
             )
             
@@ -562,74 +784,13 @@ class AccountDashboard:
                 # Ensure amount is numeric
                 transactions['amount'] = pd.to_numeric(transactions['amount'], errors='coerce')
                 
-                # Create date column if working with datetime
-                transactions['date_only'] = transactions['date'].dt.date
-                
-                # Group by date and transaction type
-                # We'll keep debits as negative values
-                transaction_amounts = []
-                
-                # Group the transactions by date and calculate the sum for each day
-                daily_amounts = transactions.groupby(['date_only'])['amount'].sum().reset_index()
-                
-                # For each day, separate into credit and debit amounts
-                for _, row in daily_amounts.iterrows():
-                    date = row['date_only']
-                    amount = row['amount']
-                    
-                    # Get credits (positive) for this date
-                    day_credits = transactions[(transactions['date_only'] == date) & 
-                                              (transactions['amount'] > 0)]['amount'].sum()
-                    
-                    # Get debits (negative) for this date
-                    day_debits = transactions[(transactions['date_only'] == date) & 
-                                             (transactions['amount'] < 0)]['amount'].sum()
-                    
-                    if day_credits > 0:
-                        transaction_amounts.append({
-                            'date_only': date,
-                            'amount': day_credits,
-                            'type': 'Credits'
-                        })
-                    
-                    if day_debits < 0:
-                        transaction_amounts.append({
-                            'date_only': date,
-                            'amount': day_debits,  # Keep as negative
-                            'type': 'Debits'
-                        })
-                
-                # Convert to DataFrame
-                amounts_by_date = pd.DataFrame(transaction_amounts)
+                # Bar chart of daily credits (positive) and debits (negative)
+                fig = _daily_amounts_figure(
+                    transactions,
+                    (self._data_version, user_id, selected_account_type, selected_time_days)
+                )
                 
-                if not amounts_by_date.empty:
-                    # Create bar chart showing credits as positive and debits as negative
-                    fig = px.bar(
-                        amounts_by_date,
-                        x='date_only',
-                        y='amount',
-                        color='type',
-                        labels={'date_only': 'Date', 'amount': 'Amount ($)', 'type': 'Transaction Type'},
-                        title="Daily Transaction Amounts",
-                        color_discrete_map={'Credits': 'rgb(26, 118, 255)', 'Debits': 'rgb(246, 78, 139)'}
-                    )
-                    
-                    # Add dollar signs to y-axis and make sure 0 is centered
-                    fig.update_layout(
-                        yaxis=dict(
-                            tickprefix="$",
-                            zeroline=True,
-                            zerolinewidth=2,
-                            zerolinecolor='#999999'
-                        ),
-                        hovermode="x unified"
-                    )
-                    
-                    # Improve hover information with proper formatting for positive/negative values
-                    fig.update_traces(
-                        hovertemplate='%{y:$,.2f}'
-                    )
-                    
+                if fig is not None:
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.info("No transaction amount data available for the selected period.")
@@ -653,19 +814,9 @@ class AccountDashboard:
             st.subheader("Spending by Category")
             
             # Create pie chart
-            fig = px.pie(
+            fig = _category_spending_figure(
                 category_spending,
-                values='amount',
-                names='category',
-                title="Spending Distribution",
-                hole=0.4
-            )
-            
-            # Improve layout
-            fig.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#000000', width=1))
+                (self._data_version, user_id, selected_account_type, selected_time_days)
             )
             
             # Show the pie chart
@@ -683,40 +834,27 @@ class AccountDashboard:
             
             if not monthly_data.empty:
                 # Create bar chart
-                fig = go.Figure()
-                
-                # Add income bars
-                fig.add_trace(go.Bar(
-                    x=monthly_data['month'],
-                    y=monthly_data['income'],
-                    name='Income',
-                    marker_color='rgb(26, 118, 255)'
-                ))
-                
-                # Add expense bars
-                fig.add_trace(go.Bar(
-                    x=monthly_data['month'],
-                    y=monthly_data['expenses'],
-                    name='Expenses',
-                    marker_color='rgb(246, 78, 139)'
-                ))
-                
-                # Update layout
-                fig.update_layout(
-                    title=f"Monthly Income vs Expenses - {selected_account_label}",
-                    xaxis_title="Month",
-                    yaxis_title="Amount ($)",
-                    barmode='group',
-                    hovermode="x unified",
-                    yaxis=dict(tickprefix="$")
+                fig = _income_vs_expenses_figure(
+                    monthly_data,
+                    (self._data_version, user_id, selected_account_type, selected_time_days),
+                    f"Monthly Income vs Expenses - {selected_account_label}"
                 )
                 
                 # Display the chart
                 st.plotly_chart(fig, use_container_width=True)
                 
-                # Calculate savings rate
-                total_income = monthly_data['income'].sum()
-                total_expenses = monthly_data['expenses'].sum()
+                # Calculate savings rate; the totals are memoized in the session per data
+                # version and selection so unrelated reruns skip the sums
+                metric_cache = st.session_state.get('dashboard_metric_cache')
+                if metric_cache is None or metric_cache.get('data_version') != self._data_version:
+                    metric_cache = {'data_version': self._data_version}
+                    st.session_state.dashboard_metric_cache = metric_cache
+                totals_key = ('income_vs_expenses', user_id, selected_account_type, selected_time_days)
+                if totals_key not in metric_cache:
+                    # Both totals in one NumPy reduction over the two columns
+                    total_income, total_expenses = monthly_data[['income', 'expenses']].to_numpy().sum(axis=0)
+                    metric_cache[totals_key] = (total_income, total_expenses)
+                total_income, total_expenses = metric_cache[totals_key]
                 
                 if total_income > 0:
                     savings_rate = (total_income - total_expenses) / total_income * 100
@@ -730,25 +868,13 @@ class AccountDashboard:
                 # Transaction breakdown by type
                 st.subheader("Transaction Breakdown")
                 
-                # Get transaction type data
-                transactions = self.get_user_transactions(
-                    user_id, 
-                    days=selected_time_days,
-                    account_type=selected_account_type
-                )
-                
+                # Reuse the transactions fetched for the Transaction History tab (same user,
+                # period and account filter) instead of querying them again
                 if 'transaction_type' in transactions.columns:
-                    # Count transactions by type
-                    tx_by_type = transactions.groupby('transaction_type').size().reset_index(name='count')
-                    
-                    # Create horizontal bar chart
-                    fig = px.bar(
-                        tx_by_type.sort_values('count'),
-                        y='transaction_type',
-                        x='count',
-                        orientation='h',
-                        title="Transaction Types",
-                        labels={'transaction_type': 'Type', 'count': 'Number of Transactions'}
+                    # Horizontal bar chart of transaction counts by type
+                    fig = _transaction_types_figure(
+                        transactions,
+                        (self._data_version, user_id, selected_account_type, selected_time_days)
                     )
                     
                     # Display the chart
@@ -766,43 +892,216 @@ class AccountDashboard:
             'total_accounts': total_accounts,
             'selected_account': selected_account_label,
             'selected_time_period': selected_time_label,
-            'accounts': user_accounts.to_dict('records'),  # Include full accounts data
+            'accounts': _records(user_accounts),  # Include full accounts data
             'chart_data': {}
         }
         
         # Add balance trend data if available
-        if 'balance_trend' in locals() and not balance_trend.empty:
-            dashboard_context['chart_data']['balance_trend'] = balance_trend.to_dict('records')
+        if balance_trend is not None and not balance_trend.empty:
+            sampled_trend = _downsample(balance_trend, 'balance_after')
+            dashboard_context['chart_data']['balance_trend'] = _records(sampled_trend.assign(
+                date_only=sampled_trend['date_only'].dt.strftime('%Y-%m-%d')
+            ))
         
         # Add mortgage trend data if available
-        if 'mortgage_trend' in locals() and not mortgage_trend.empty:
-            dashboard_context['chart_data']['mortgage_trend'] = mortgage_trend.to_dict('records')
+        if mortgage_trend is not None and not mortgage_trend.empty:
+            sampled_trend = _downsample(mortgage_trend, 'balance_after')
+            dashboard_context['chart_data']['mortgage_trend'] = _records(sampled_trend.assign(
+                date_only=sampled_trend['date_only'].dt.strftime('%Y-%m-%d')
+            ))
             
         # Add spending data if it was retrieved
-        if 'category_spending' in locals() and not category_spending.empty:
-            dashboard_context['chart_data']['category_spending'] = category_spending.to_dict('records')
+        if category_spending is not None and not category_spending.empty:
+            dashboard_context['chart_data']['category_spending'] = _records(category_spending)
             
         # Add income vs expenses data if available
-        if 'monthly_data' in locals() and not monthly_data.empty:
-            dashboard_context['chart_data']['income_vs_expenses'] = monthly_data.to_dict('records')
+        if monthly_data is not None and not monthly_data.empty:
+            dashboard_context['chart_data']['income_vs_expenses'] = _records(monthly_data)
         
         # Store in session state for the LLM to access
         st.session_state.dashboard_context = dashboard_context
         
-        # Store chart data in session state for chatbot to access
-        if "chart_data" in st.session_state:
-            # Merge new chart data with existing data to preserve any values not updated in this render
-            st.session_state.chart_data.update(dashboard_context['chart_data'])
-        else:
+        # Store chart data in session state for chatbot to access, skipping the merge when
+        # the same data and selection were already stored by a previous rerun
+        chart_signature = (self._data_version, user_id, selected_account_type, selected_time_days,
+                           tuple(dashboard_context['chart_data']))
+        if "chart_data" not in st.session_state:
             # First time setting chart data
             st.session_state.chart_data = dashboard_context['chart_data']
+            st.session_state.dashboard_chart_signature = chart_signature
+        elif st.session_state.get('dashboard_chart_signature') != chart_signature:
+            # Merge new chart data with existing data to preserve any values not updated in this render
+            st.session_state.chart_data.update(dashboard_context['chart_data'])
+            st.session_state.dashboard_chart_signature = chart_signature
         
         return dashboard_context
 
 
+# Memoized per-user derivations. The dashboard instance is excluded from the cache key
+# (leading underscore); data_version identifies the loaded data instead, so results
+# survive reruns and are recomputed whenever the underlying CSV files change.
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_user_transactions(_dashboard, data_version, user_id, days, account_type):
+    return _dashboard._get_user_transactions(user_id, days, account_type)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_spending_by_category(_dashboard, data_version, user_id, days, account_type):
+    return _dashboard._get_user_spending_by_category(user_id, days, account_type)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_balance_trend(_dashboard, data_version, user_id, account_type, days, exclude_mortgage):
+    return _dashboard._get_account_balance_trend(user_id, account_type, days, exclude_mortgage)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_monthly_income_vs_expenses(_dashboard, data_version, user_id, months, account_type):
+    return _dashboard._get_monthly_income_vs_expenses(user_id, months, account_type)
+
+
+# Plotly figures built from the derivations above. The source frame is excluded from the
+# cache key; figure_key (data version plus the user's selections) identifies it instead,
+# so switching tabs or toggling unrelated widgets reuses the already-built figure. Entries
+# are bounded because every rewrite of the CSVs produces new keys.
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _balance_trend_figure(_balance_trend, figure_key, title):
+    fig = px.line(
+        _balance_trend,
+        x='date_only',
+        y='balance_after',
+        labels={'date_only': 'Date', 'balance_after': 'Balance'},
+        title=title,
+        # Long series are drawn with WebGL (scattergl) instead of one SVG node per point
+        render_mode='webgl' if len(_balance_trend) > WEBGL_POINT_THRESHOLD else 'auto'
+    )
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Balance ($)",
+        hovermode="x unified"
+    )
+    # Add dollar signs to y-axis
+    fig.update_layout(yaxis=dict(tickprefix="$"))
+    return fig
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _daily_amounts_figure(_transactions, figure_key):
+    # Sum credits (positive) and debits (negative, kept as negative) per day in one pass
+    daily_amounts = (
+        _transactions
+        .assign(date_only=_transactions['date'].dt.floor('D'),
+                Credits=_transactions['amount'].clip(lower=0),
+                Debits=_transactions['amount'].clip(upper=0))
+        .groupby('date_only', as_index=False)[['Credits', 'Debits']]
+        .sum()
+    )
+    
+    # Long format for plotting, dropping days without credits or debits
+    amounts_by_date = daily_amounts.melt('date_only', var_name='type', value_name='amount')
+    amounts_by_date = amounts_by_date[amounts_by_date['amount'] != 0]
+    if amounts_by_date.empty:
+        return None
+    
+    # Create bar chart showing credits as positive and debits as negative
+    fig = px.bar(
+        amounts_by_date,
+        x='date_only',
+        y='amount',
+        color='type',
+        labels={'date_only': 'Date', 'amount': 'Amount ($)', 'type': 'Transaction Type'},
+        title="Daily Transaction Amounts",
+        color_discrete_map={'Credits': 'rgb(26, 118, 255)', 'Debits': 'rgb(246, 78, 139)'}
+    )
+    
+    # Add dollar signs to y-axis and make sure 0 is centered
+    fig.update_layout(
+        yaxis=dict(
+            tickprefix="$",
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor='#999999'
+        ),
+        hovermode="x unified"
+    )
+    
+    # Improve hover information with proper formatting for positive/negative values
+    fig.update_traces(
+        hovertemplate='%{y:$,.2f}'
+    )
+    return fig
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _category_spending_figure(_category_spending, figure_key):
+    fig = px.pie(
+        _category_spending,
+        values='amount',
+        names='category',
+        title="Spending Distribution",
+        hole=0.4
+    )
+    
+    # Improve layout
+    fig.update_traces(
+        textposition='inside', 
+        textinfo='percent+label',
+        marker=dict(line=dict(color='#000000', width=1))
+    )
+    return fig
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _income_vs_expenses_figure(_monthly_data, figure_key, title):
+    # Declared as a plain dict spec and validated once by the Figure constructor,
+    # rather than through separate add_traces/update_layout passes
+    months = _monthly_data['month'].tolist()
+    return go.Figure({
+        'data': [
+            # Income bars
+            {'type': 'bar', 'x': months, 'y': _monthly_data['income'].tolist(),
+             'name': 'Income', 'marker': {'color': 'rgb(26, 118, 255)'}},
+            # Expense bars
+            {'type': 'bar', 'x': months, 'y': _monthly_data['expenses'].tolist(),
+             'name': 'Expenses', 'marker': {'color': 'rgb(246, 78, 139)'}}
+        ],
+        'layout': {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': "Month"}},
+            'yaxis': {'title': {'text': "Amount ($)"}, 'tickprefix': "$"},
+            'barmode': 'group',
+            'hovermode': "x unified"
+        }
+    })
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _transaction_types_figure(_transactions, figure_key):
+    # Count transactions by type, smallest first (unused categories of the categorical are dropped)
+    type_counts = _transactions['transaction_type'].value_counts(ascending=True)
+    tx_by_type = type_counts[type_counts > 0].rename_axis('transaction_type').reset_index(name='count')
+    
+    return px.bar(
+        tx_by_type,
+        y='transaction_type',
+        x='count',
+        orientation='h',
+        title="Transaction Types",
+        labels={'transaction_type': 'Type', 'count': 'Number of Transactions'}
+    )
+
+
+# One dashboard instance (loaded tables, lookups and arrays) shared across reruns and
+# sessions; data_files_version changes whenever a CSV is rewritten (e.g. by a transfer),
+# so only the current and previous versions are kept
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _get_account_dashboard(data_files_version):
+    return AccountDashboard()
+
+
 def display_account_dashboard(user_id, user_fullname):
     """Display the integrated account dashboard."""
-    dashboard = AccountDashboard()
+    dashboard = _get_account_dashboard(_data_files_version(_default_data_dir()))
     
     # Get cached chart data if available
     cached_chart_data = st.session_state.get("chart_data", {})
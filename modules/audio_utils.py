@@ -2,6 +2,8 @@ import logging
 from gtts import gTTS
 import streamlit as st
 import io
+import re
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI, OpenAIError
 from dotenv import load_dotenv
 import os
@@ -11,6 +13,9 @@ load_dotenv()
 openai_api_key = os.getenv('OPENAI_API_KEY')
 LOGGER = logging.getLogger('AudioUtils')
 
+# A sentence ends at ., ! or ? followed by whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
 @st.cache_resource
 def get_openai_client():
     """Returns a cached OpenAI client instance to avoid creating new clients for each request."""
@@ -34,19 +39,13 @@ def transcribe_audio(audio):
     else:
         audio_bytes = audio
     
-    # Write data to a temporary WAV file with proper headers
-    import tempfile
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-        temp_file.write(audio_bytes)
-        temp_file_path = temp_file.name
-    
     try:
-        with open(temp_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language='en'
-            )
+        # Upload the recording straight from memory; the filename tells the API the format
+        transcript = client.audio.transcriptions.create(
+            model="whisper-1",
+            file=("recording.wav", audio_bytes),
+            language='en'
+        )
         output = transcript.text
         st.write(f"Transcribed: {output}")
         return output
@@ -56,10 +55,6 @@ def transcribe_audio(audio):
     except Exception as e:
         st.write(f"Unexpected error in transcription: {e}")
         return ""
-    finally:
-        # Clean up temp file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
 
 
 def text_to_speech(response):
@@ -84,6 +79,90 @@ def text_to_speech(response):
     except Exception as e:
         LOGGER.error(f"Error in text-to-speech conversion: {str(e)}")
 
+def synthesize_speech(text):
+    """
+    Converts text to speech with gTTS and returns the encoded audio bytes.
+    
+    Args:
+        text (str): Text to be converted to speech.
+    """
+    buffer = io.BytesIO()
+    gTTS(text=text, lang='en').write_to_fp(buffer)
+    return buffer.getvalue()
+
+class StreamingSpeech:
+    """
+    Converts a streamed response to speech sentence by sentence, so the
+    speech for early sentences is produced while later ones are still
+    being generated.
+    """
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._futures = []
+        self._buffer = ""
+        self._failed = False
+
+    def feed(self, chunks):
+        """
+        Passes text chunks through unchanged, queueing each completed sentence for synthesis.
+        
+        If the chunks raise, the queued sentences are discarded so that save
+        speaks the final response text instead of the partial reply.
+        
+        Args:
+            chunks: Iterable of text chunks, e.g. a streamed chatbot response.
+        """
+        try:
+            for chunk in chunks:
+                self._buffer += chunk
+                *sentences, self._buffer = SENTENCE_END.split(self._buffer)
+                for sentence in sentences:
+                    if sentence.strip():
+                        self._futures.append(self._executor.submit(synthesize_speech, sentence))
+                yield chunk
+        except Exception:
+            self._discard()
+            raise
+
+    def _discard(self):
+        """Drops the queued sentences and stops the worker threads."""
+        self._failed = True
+        self._buffer = ""
+        self._futures = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def save(self, response):
+        """
+        Waits for the queued sentences and saves the combined audio as response.wav.
+        
+        Falls back to text_to_speech on the full response if nothing was
+        streamed, the stream failed or a sentence failed to convert.
+        
+        Args:
+            response (str): The full response text.
+        """
+        try:
+            if self._failed:
+                text_to_speech(response)
+                return
+            if self._buffer.strip():
+                self._futures.append(self._executor.submit(synthesize_speech, self._buffer))
+            self._buffer = ""
+            if not self._futures:
+                text_to_speech(response)
+                return
+            # gTTS produces MP3 frames, which play back correctly when concatenated
+            audio = b"".join(future.result() for future in self._futures)
+            with open('response.wav', 'wb') as f:
+                f.write(audio)
+            LOGGER.info("Audio file created successfully")
+        except Exception as e:
+            LOGGER.error(f"Error in streamed text-to-speech conversion: {str(e)}")
+            text_to_speech(response)
+        finally:
+            self._futures = []
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
 def play_audio(file_name):
     """
     Plays audio file in the Streamlit app.
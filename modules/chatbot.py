@@ -878,192 +878,241 @@ class ChatBot:
             str: The chatbot's response
         """
         try:
-            # First ensure the input is actually a string to prevent variable name references
-            if not isinstance(user_input, str):
-                logging.warning(f"Non-string input received: {type(user_input)}")
-                user_input = str(user_input)
-                
-            # Clean user input
-            user_input = user_input.strip()
-            if not user_input:
-                return "I didn't receive any input. How can I help you today?"
+            reply, messages = self._prepare_response(user_input, chart_context)
+            if reply is not None:
+                return reply
             
-            # Add account information to context if available
-            accounts_context = ""
-            if hasattr(st, 'session_state') and 'dashboard_context' in st.session_state:
-                try:
-                    dc = st.session_state.dashboard_context
-                    if 'accounts' in dc and dc['accounts']:
-                        accounts_context = "\n\n=== USER ACCOUNTS INFORMATION ===\n"
-                        accounts_context += "| ACCOUNT NAME | ACCOUNT TYPE | BALANCE |\n"
-                        accounts_context += "|-------------|--------------|--------|\n"
-                        
-                        for account in dc['accounts']:
-                            account_name = account.get('account_name', 'Unknown')
-                            account_type = account.get('account_type', 'Unknown')
-                            balance = account.get('balance', 0)
-                            try:
-                                balance_float = float(balance)
-                                balance_str = f"${balance_float:,.2f}"
-                            except (ValueError, TypeError):
-                                balance_str = str(balance)
-                            
-                            accounts_context += f"| {account_name} | {account_type} | {balance_str} |\n"
-                            
-                        # Add a note to ensure the LLM uses this information
-                        accounts_context += "\nIMPORTANT: When asked about ANY account, use ONLY the account information provided above."
-                except Exception as e:
-                    logging.error(f"Error formatting accounts context: {e}")
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=150,
+                temperature=0.7
+            )
             
-            # Append accounts context to chart context if available
-            if chart_context and accounts_context:
-                chart_context += accounts_context
-            elif accounts_context:
-                chart_context = accounts_context
-                
-            # Sanitize user input to prevent direct variable reference errors
-            # Convert common financial terms that might match variable names to safe queries
-            safe_input = user_input
-            financial_terms_mapping = {
-                'checking_balance': 'checking account balance',
-                'savings_balance': 'savings account balance',
-                'credit_balance': 'credit card balance',
-                'mortgage': 'mortgage details',
-                'spending_distribution': 'spending distribution',
-                'avg_income': 'average income',
-                'avg_expenses': 'average expenses',
-                'balance_trend': 'balance trend'
-            }
+            # Extract and return the assistant's message
+            assistant_message = response.choices[0].message.content
+            return assistant_message
+        except Exception as e:
+            logging.error(f"Error generating response: {str(e)}")
+            return "I'm sorry, I encountered an error while processing your request. Please try again."
+
+    def stream_response(self, user_input, chart_context=None):
+        """
+        Generate a response to the user's input, yielding it as the model produces it.
+        
+        Args:
+            user_input: The user's input text
+            chart_context: Optional context from financial charts being viewed
             
-            # Replace any exact matches with safer terms
-            for term, replacement in financial_terms_mapping.items():
-                if safe_input.lower() == term.lower():
-                    logging.info(f"Replacing potential variable reference '{term}' with '{replacement}'")
-                    safe_input = replacement
+        Yields:
+            str: Successive pieces of the chatbot's response
+        """
+        try:
+            reply, messages = self._prepare_response(user_input, chart_context)
+            if reply is not None:
+                yield reply
+                return
             
-            # First use embedding-based classification (primary method)
-            intent = self.classify_text(safe_input)
+            stream = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=150,
+                temperature=0.7,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logging.error(f"Error generating response: {str(e)}")
+            yield "I'm sorry, I encountered an error while processing your request. Please try again."
+
+    def _prepare_response(self, user_input, chart_context=None):
+        """
+        Classify the user's input and build the prompt for the response.
+        
+        Args:
+            user_input: The user's input text
+            chart_context: Optional context from financial charts being viewed
             
-            # Check if this is a generic savings query (for grouping regular, travel, high-yield savings)
-            is_savings_query = self._is_generic_savings_query(safe_input)
+        Returns:
+            tuple: (reply, messages) where reply is a ready answer that needs no
+            model call, otherwise None and messages is the chat prompt
+        """
+        # First ensure the input is actually a string to prevent variable name references
+        if not isinstance(user_input, str):
+            logging.warning(f"Non-string input received: {type(user_input)}")
+            user_input = str(user_input)
             
-            # Normalize the intent (replace underscores with spaces)
-            if "_" in intent:
-                intent = intent.replace("_", " ")
+        # Clean user input
+        user_input = user_input.strip()
+        if not user_input:
+            return "I didn't receive any input. How can I help you today?", None
+        
+        # Add account information to context if available
+        accounts_context = ""
+        if hasattr(st, 'session_state') and 'dashboard_context' in st.session_state:
+            try:
+                dc = st.session_state.dashboard_context
+                if 'accounts' in dc and dc['accounts']:
+                    accounts_context = "\n\n=== USER ACCOUNTS INFORMATION ===\n"
+                    accounts_context += "| ACCOUNT NAME | ACCOUNT TYPE | BALANCE |\n"
+                    accounts_context += "|-------------|--------------|--------|\n"
+                    
+                    for account in dc['accounts']:
+                        account_name = account.get('account_name', 'Unknown')
+                        account_type = account.get('account_type', 'Unknown')
+                        balance = account.get('balance', 0)
+                        try:
+                            balance_float = float(balance)
+                            balance_str = f"${balance_float:,.2f}"
+                        except (ValueError, TypeError):
+                            balance_str = str(balance)
+                        
+                        accounts_context += f"| {account_name} | {account_type} | {balance_str} |\n"
+                        
+                    # Add a note to ensure the LLM uses this information
+                    accounts_context += "\nIMPORTANT: When asked about ANY account, use ONLY the account information provided above."
+            except Exception as e:
+                logging.error(f"Error formatting accounts context: {e}")
+        
+        # Append accounts context to chart context if available
+        if chart_context and accounts_context:
+            chart_context += accounts_context
+        elif accounts_context:
+            chart_context = accounts_context
             
-            # Force Account Inquiries intent for generic savings queries
-            if is_savings_query and intent == "default":
-                intent = "Account Inquiries"
-                logging.info("Forcing Account Inquiries intent for generic savings query")
+        # Sanitize user input to prevent direct variable reference errors
+        # Convert common financial terms that might match variable names to safe queries
+        safe_input = user_input
+        financial_terms_mapping = {
+            'checking_balance': 'checking account balance',
+            'savings_balance': 'savings account balance',
+            'credit_balance': 'credit card balance',
+            'mortgage': 'mortgage details',
+            'spending_distribution': 'spending distribution',
+            'avg_income': 'average income',
+            'avg_expenses': 'average expenses',
+            'balance_trend': 'balance trend'
+        }
+        
+        # Replace any exact matches with safer terms
+        for term, replacement in financial_terms_mapping.items():
+            if safe_input.lower() == term.lower():
+                logging.info(f"Replacing potential variable reference '{term}' with '{replacement}'")
+                safe_input = replacement
+        
+        # First use embedding-based classification (primary method)
+        intent = self.classify_text(safe_input)
+        
+        # Check if this is a generic savings query (for grouping regular, travel, high-yield savings)
+        is_savings_query = self._is_generic_savings_query(safe_input)
+        
+        # Normalize the intent (replace underscores with spaces)
+        if "_" in intent:
+            intent = intent.replace("_", " ")
+        
+        # Force Account Inquiries intent for generic savings queries
+        if is_savings_query and intent == "default":
+            intent = "Account Inquiries"
+            logging.info("Forcing Account Inquiries intent for generic savings query")
+        
+        # Only use pattern matching as fallback if embedding classification returned "default"
+        if intent == "default":
+            # Direct pattern matching for spending-related queries as fallback
+            spending_patterns = [
+                r"(which|what) category should i cut back",
+                r"spending analytics",
+                r"where (am i|are my) (over)?spending",
+                r"reduce spending",
+                r"cut back on",
+                r"budget",
+                r"spending category",
+                r"expense(s)? breakdown"
+            ]
             
-            # Only use pattern matching as fallback if embedding classification returned "default"
+            # Check for spending-related patterns
+            for pattern in spending_patterns:
+                if re.search(pattern, safe_input.lower(), re.IGNORECASE):
+                    logging.info(f"Fallback pattern match: Spending Analysis based on pattern {pattern}")
+                    intent = "Spending Analysis"
+                    break
+                    
+            # Account balance patterns as fallback
             if intent == "default":
-                # Direct pattern matching for spending-related queries as fallback
-                spending_patterns = [
-                    r"(which|what) category should i cut back",
-                    r"spending analytics",
-                    r"where (am i|are my) (over)?spending",
-                    r"reduce spending",
-                    r"cut back on",
-                    r"budget",
-                    r"spending category",
-                    r"expense(s)? breakdown"
+                account_patterns = [
+                    r"how much (do|have) i (have )?in my (savings|checking|account|travel|high.yield)",
+                    r"what('s| is) my (savings|checking|travel|high.yield) (account )?balance",
+                    r"balance in (my )?(savings|checking|travel|high.yield)",
+                    r"how much money (do|have) i (have )?in (my )?(savings|checking|travel|high.yield)"
                 ]
                 
-                # Check for spending-related patterns
-                for pattern in spending_patterns:
+                for pattern in account_patterns:
                     if re.search(pattern, safe_input.lower(), re.IGNORECASE):
-                        logging.info(f"Fallback pattern match: Spending Analysis based on pattern {pattern}")
-                        intent = "Spending Analysis"
+                        logging.info(f"Fallback pattern match: Account Inquiries based on pattern {pattern}")
+                        intent = "Account Inquiries"
                         break
-                        
-                # Account balance patterns as fallback
-                if intent == "default":
-                    account_patterns = [
-                        r"how much (do|have) i (have )?in my (savings|checking|account|travel|high.yield)",
-                        r"what('s| is) my (savings|checking|travel|high.yield) (account )?balance",
-                        r"balance in (my )?(savings|checking|travel|high.yield)",
-                        r"how much money (do|have) i (have )?in (my )?(savings|checking|travel|high.yield)"
-                    ]
-                    
-                    for pattern in account_patterns:
-                        if re.search(pattern, safe_input.lower(), re.IGNORECASE):
-                            logging.info(f"Fallback pattern match: Account Inquiries based on pattern {pattern}")
-                            intent = "Account Inquiries"
-                            break
+        
+        logging.info(f"Final intent (after fallback checks): {intent}")
+        
+        # Handle money transfer intent with specialized handler
+        if intent == "Money Transfer":
+            logging.info("Using money transfer handler")
+            return self.money_transfer_handler.handle(safe_input), None
             
-            logging.info(f"Final intent (after fallback checks): {intent}")
+        # Get system prompt based on intent
+        system_prompt = self.config.get(intent, self.config["default"])["system_prompt"]
+        
+        # For account balance inquiries, ensure we prioritize real account data
+        if "Account" in intent or "balance" in safe_input.lower() or is_savings_query:
+            # Get banking context first to ensure we have account data
+            banking_context = self.prepare_banking_context(safe_input, intent)
             
-            # Handle money transfer intent with specialized handler
-            if intent == "Money Transfer":
-                logging.info("Using money transfer handler")
-                return self.money_transfer_handler.handle(safe_input)
-                
-            # Get system prompt based on intent
-            system_prompt = self.config.get(intent, self.config["default"])["system_prompt"]
+            # Add explicit instruction to use actual account data
+            system_prompt += """
             
-            # For account balance inquiries, ensure we prioritize real account data
-            if "Account" in intent or "balance" in safe_input.lower() or is_savings_query:
-                # Get banking context first to ensure we have account data
-                banking_context = self.prepare_banking_context(safe_input, intent)
-                
-                # Add explicit instruction to use actual account data
+            IMPORTANT INSTRUCTION: When responding about account balances or financial information,
+            ONLY use the ACTUAL USER BANKING DATA provided below. Do NOT use sample data or make up numbers.
+            If specific account data is not provided, tell the user you don't have that information.
+            """
+            
+            # Add special instruction for generic savings queries
+            if is_savings_query:
                 system_prompt += """
                 
-                IMPORTANT INSTRUCTION: When responding about account balances or financial information,
-                ONLY use the ACTUAL USER BANKING DATA provided below. Do NOT use sample data or make up numbers.
-                If specific account data is not provided, tell the user you don't have that information.
+                SPECIAL INSTRUCTION FOR SAVINGS ACCOUNTS:
+                The user is asking about savings accounts in general. You should provide information about
+                ALL savings account types (Regular Savings, Travel Savings, High-Yield Savings) in your response.
+                List each savings account with its specific name, type, and balance.
                 """
-                
-                # Add special instruction for generic savings queries
-                if is_savings_query:
-                    system_prompt += """
-                    
-                    SPECIAL INSTRUCTION FOR SAVINGS ACCOUNTS:
-                    The user is asking about savings accounts in general. You should provide information about
-                    ALL savings account types (Regular Savings, Travel Savings, High-Yield Savings) in your response.
-                    List each savings account with its specific name, type, and balance.
-                    """
-                
-                # Add banking context to prompt to ensure LLM has actual account data
-                if banking_context:
-                    system_prompt += f"\n\n===== ACTUAL USER BANKING DATA (Use ONLY this data) =====\n{banking_context}"
-                else:
-                    logging.error("No banking context available for account inquiry")
-            
-            # Add chart context to prompt if available and relevant 
-            chart_aware_intents = ["Chart Analysis", "Spending Analysis", "Account Inquiries", "Financial Management"]
-            if chart_context and any(intent_name in intent for intent_name in chart_aware_intents):
-                system_prompt += f"\n\nCurrent financial data from dashboard:\n{chart_context}"
-            
-            # For other intents, add general banking context
-            if intent != "Account Inquiries" and "Account" not in intent:
-                banking_context_intents = ["Transactions", "Money Transfer", 
-                                         "Financial Management", "Investment Advice", "Interest Rates"]
-                if any(intent_name in intent for intent_name in banking_context_intents):
-                    banking_context = self.prepare_banking_context(safe_input, intent)
-                    if banking_context:
-                        system_prompt += f"\n\nUSER BANKING DATA:\n{banking_context}"
-                        logging.info("Added banking context to prompt")
-            
-            # Generate response using OpenAI
-            logging.info(f"Generating response for intent: {intent}")
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": safe_input}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
             
-            # Extract and return the assistant's message
-            assistant_message = response.choices[0].message.content
-            return assistant_message
-        except Exception as e:
-            logging.error(f"Error generating response: {str(e)}")
-            return "I'm sorry, I encountered an error while processing your request. Please try again."
+            # Add banking context to prompt to ensure LLM has actual account data
+            if banking_context:
+                system_prompt += f"\n\n===== ACTUAL USER BANKING DATA (Use ONLY this data) =====\n{banking_context}"
+            else:
+                logging.error("No banking context available for account inquiry")
+        
+        # Add chart context to prompt if available and relevant 
+        chart_aware_intents = ["Chart Analysis", "Spending Analysis", "Account Inquiries", "Financial Management"]
+        if chart_context and any(intent_name in intent for intent_name in chart_aware_intents):
+            system_prompt += f"\n\nCurrent financial data from dashboard:\n{chart_context}"
+        
+        # For other intents, add general banking context
+        if intent != "Account Inquiries" and "Account" not in intent:
+            banking_context_intents = ["Transactions", "Money Transfer", 
+                                     "Financial Management", "Investment Advice", "Interest Rates"]
+            if any(intent_name in intent for intent_name in banking_context_intents):
+                banking_context = self.prepare_banking_context(safe_input, intent)
+                if banking_context:
+                    system_prompt += f"\n\nUSER BANKING DATA:\n{banking_context}"
+                    logging.info("Added banking context to prompt")
+        
+        # Generate response using OpenAI
+        logging.info(f"Generating response for intent: {intent}")
+        return None, [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": safe_input}
+        ]
 
     def _is_generic_savings_query(self, user_input):
         """Check if user is asking about savings accounts in general, without specifying type."""
@@ -5,6 +5,7 @@ import uuid
 from datetime import datetime
 import re
 import random
+import threading
 
 # Configure logging - only if not already configured
 if not logging.getLogger().handlers:
@@ -41,6 +42,10 @@ class MoneyTransfer:
         self.transactions_file = os.path.join(self.data_dir, 'transaction_history.csv')
         self.users_file = os.path.join(self.data_dir, 'users.csv')
         
+        # Serializes use of an instance shared between sessions
+        self.lock = threading.RLock()
+        self._data_version = None
+        
         # Load data
         self.load_data()
     
@@ -90,6 +95,7 @@ class MoneyTransfer:
             LOGGER.info(f"Loaded {len(self.accounts)} accounts, {len(self.transactions)} transactions")
             LOGGER.info(f"Loaded {len(self.users)} users")
             
+            self._data_version = self._file_version()
             return True
         except Exception as e:
             LOGGER.error(f"Error loading data: {e}")
@@ -112,11 +118,27 @@ class MoneyTransfer:
             self.transactions.to_csv(self.transactions_file, index=False)
             
             LOGGER.info("Successfully saved updated data to CSV files")
+            self._data_version = self._file_version()
             return True
         except Exception as e:
             LOGGER.error(f"Error saving data: {e}")
             return False
     
+    def _file_version(self):
+        """Return the modification times of the data files, or None for missing files."""
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None
+                     for path in (self.accounts_file, self.transactions_file, self.users_file))
+    
+    def reload_if_changed(self):
+        """Reload the data if the CSV files were changed since they were last loaded or saved.
+        
+        Returns:
+        bool: True if the data was reloaded
+        """
+        if self._file_version() == self._data_version:
+            return False
+        return self.load_data()
+    
     def validate_user(self, user_id):
         """Validate that a user exists."""
         if user_id is None: